@@ -7,97 +7,184 @@ placement
 
 __version__ = '1.0'
 
-import objc_util
-import ui
-import inspect, gc, types, sys, random, math
+try:
+    import objc_util
+    import ui
+except ImportError as error:
+    # Not in Pythonista, use the headless stand-ins
+    try:
+        import anchor_headless
+    except ImportError:
+        raise ImportError(
+            'anchor needs the objc_util and ui modules of Pythonista. '
+            'Elsewhere, it runs with the stand-ins in anchor_headless.py '
+            'and anchor_solver.py, which are not part of the installed '
+            'package: use anchor from a checkout of the repository.'
+        ) from error
+    anchor_headless.install()
+    import objc_util
+    import ui
+import sys, math, time
 import keyword
+import weakref
+import threading
 from types import SimpleNamespace
-from copy import copy
 from collections import defaultdict
-from functools import partial
-
-NSLayoutConstraint = objc_util.ObjCClass('NSLayoutConstraint')
-UILayoutGuide = objc_util.ObjCClass('UILayoutGuide')
-UIDevice = objc_util.ObjCClass('UIDevice')
-UIViewPropertyAnimator = objc_util.ObjCClass('UIViewPropertyAnimator')
+from functools import lru_cache, wraps
+
+# ObjC classes, looked up on first use
+OBJC_CLASSES = (
+    'NSLayoutConstraint', 'UILayoutGuide', 'UIApplication', 'UIDevice',
+    'UIViewPropertyAnimator')
+
+
+@lru_cache(maxsize=None)
+def objc_class(name):
+    return objc_util.ObjCClass(name)
+
+
+# Constraint attributes - numbers are
+# Apple NSLayoutConstraint constants
+
+# Magical type code contains three letters:
+#   1. Position/Size
+#   2. Horizontal/Vertical/NA
+#   3. Absolute/Relative/NA
+# These are used to check constraint
+# compatibility
+
+# code, name, type, usable with a layout guide
+ATTRIBUTES = (
+    (1, 'left', 'PHA', True),
+    (2, 'right', 'PHA', True),
+    (3, 'top', 'PVN', True),
+    (4, 'bottom', 'PVN', True),
+    (5, 'leading', 'PHR', True),
+    (6, 'trailing', 'PHR', True),
+    (7, 'width', 'SNN', True),
+    (8, 'height', 'SNN', True),
+    (9, 'center_x', 'PHN', True),
+    (10, 'center_y', 'PVN', True),
+    (11, 'last_baseline', 'PVN', False),
+    (12, 'first_baseline', 'PVN', False),
+    (13, 'left_margin', 'PHA', False),
+    (14, 'right_margin', 'PHA', False),
+    (15, 'top_margin', 'PVN', False),
+    (16, 'bottom_margin', 'PVN', False),
+    (17, 'leading_margin', 'PHR', False),
+    (18, 'trailing_margin', 'PHR', False),
+)
+
+# Padding attributes are regular attributes
+# with a standard margin added on the outside
+
+# name, attribute, direction of the margin
+PADDINGS = (
+    ('left_padding', 'left', -1),
+    ('right_padding', 'right', 1),
+    ('top_padding', 'top', -1),
+    ('bottom_padding', 'bottom', 1),
+    ('leading_padding', 'leading', -1),
+    ('trailing_padding', 'trailing', 1),
+)
+
+ATTRIBUTE_TYPES = {0: 'NNN'}
+ATTRIBUTE_TYPES.update(
+    (code, type_str) for code, _, type_str, _ in ATTRIBUTES)
+ATTRIBUTE_NAMES = {0: 'na'}
+ATTRIBUTE_NAMES.update((code, name) for code, name, _, _ in ATTRIBUTES)
+
+# Attribute codes looked up by name or by code
+ATTRIBUTE_CODES = {code: code for code in ATTRIBUTE_NAMES if code}
+ATTRIBUTE_CODES.update((name, code) for code, name, _, _ in ATTRIBUTES)
+GUIDE_ATTRIBUTES = frozenset(
+    code for code, _, _, guide in ATTRIBUTES if guide)
+
+
+def compatible_types(type_str, other_type_str):
+    return all(
+        t == 'N' or ot == 'N' or t == ot
+        for t, ot in zip(type_str, other_type_str))
+
+
+# COMPATIBLE[attribute][other_attribute], 0 for no other attribute
+COMPATIBLE = [
+    [compatible_types(ATTRIBUTE_TYPES[code], ATTRIBUTE_TYPES[other_code])
+     for other_code in range(len(ATTRIBUTES) + 1)]
+    for code in range(len(ATTRIBUTES) + 1)]
+
+# (attribute, other attribute, relation) combinations that can be used in
+# a constraint, 0 for no other attribute
+VALID_SPECS = frozenset(
+    (code, other_code, relation)
+    for code in range(1, len(ATTRIBUTES) + 1)
+    for other_code in range(len(ATTRIBUTES) + 1)
+    for relation in (-1, 0, 1)
+    if COMPATIBLE[code][other_code])
+
+
+class Attribute:
+    """
+    Descriptor for the constraint attributes of `At`, returning a new
+    builder for the attribute. Assigning to the attribute is the same as
+    comparing it with `==`.
+    """
 
+    __slots__ = ('code', 'name', 'type_str', 'guide', 'padding')
+
+    def __init__(self, code, name, type_str, guide, padding=0):
+        self.code = code
+        self.name = name
+        self.type_str = type_str
+        self.guide = guide
+        self.padding = padding
+
+    def __get__(self, at, owner=None):
+        if at is None:
+            return self
+        view = at.view
+        if not self.guide and type(view) is Guide:
+            raise AttributeError(
+                f"Cannot use attribute '{self.name}' with a layout guide")
+        c = At(view, at._priority, self.code, self.name, self.type_str)
+        if self.padding:
+            c._constant = self.padding * At.standard
+        return c
 
-def prop(func):
-    """Combined getter/setter property"""
-    return property(func, func)
+    def __set__(self, at, value):
+        self.__get__(at) == value
 
 
 class At:
+    """
+    Builder for constraints, available as `view.at`. Accessing an attribute
+    returns a new builder for that attribute, and comparing it with another
+    builder or a number creates the constraint and returns a `Constraint`.
+    """
+
+    __slots__ = ('view', 'attribute', 'attribute_name', 'attribute_type',
+                 'multiplier', '_constant', '_priority')
+
     standard = 8
 
-    def __init__(self, view, priority=1000):
+    def __init__(self, view, priority=1000,
+            attribute=0, attribute_name='na', attribute_type='NNN'):
         """
         Initialize a constraint manager for a view with the given priority.
         """
 
         self.view = view
-        self.attribute = 0
-        self.attribute_name = 'na'
-        self.attribute_type = 'NNN'
-        self.operator = 0
-        self.other_view = None
-        self.other_attribute = 0
-        self.other_attribute_name = 'na'
-        self.other_attribute_type = 'NNN'
+        self.attribute = attribute
+        self.attribute_name = attribute_name
+        self.attribute_type = attribute_type
         self.multiplier = 1
-        self.description = None
         self._constant = 0
         self._priority = priority
 
-    @property
-    def objc_constraint(self):
-        if self.description is None:
-            return None
-        return find_constraint(self.view, self.description)
-
     @property
     def constant(self):
-        """
-        Constant part of the constraint equation:
-          `target.attribute == source.attribute * multiplier + constant`.
-        This is the only part of the equation that can be changed
-        after the constraint has been created.
-        """
         return self._constant
 
-    @constant.setter
-    def constant(self, value):
-        self._constant = value
-
-    def __str__(self):
-        operators = ['<=', '==', '>=']
-
-        view = self.view.name if self.view.name else type(self.view).__name__
-
-        operator = operators[self.operator + 1]
-
-        other_view = self.other_view.name if \
-            self.other_view and self.other_view.name \
-            else (type(
-            self.other_view).__name__ if self.other_view is not None else '')
-
-        other_attribute_str = '' \
-            if self.other_attribute == 0 \
-            else f'.{self.other_attribute_name} '
-
-        multiplier_str = f'* {self.multiplier} ' \
-            if self.multiplier != 1 else ''
-
-        constant_str = ''
-        if self.constant < 0:
-            constant_str = f'- {abs(self.constant)}'
-        elif self.constant > 0:
-            constant_str = f'+ {self.constant}'
-
-        return (f'{view}.{self.attribute_name} {operator} '
-                f'{other_view}{other_attribute_str}'
-                f'{multiplier_str}{constant_str}')
-
     # CONSTRAINT OPERATORS
 
     def __mul__(self, other):
@@ -117,124 +204,13 @@ class At:
         return self
 
     def __le__(self, other):
-        c = copy(self)
-        c.operator = -1
-        c._create_constraint(other)
-        return c
+        return Constraint(self, -1, other)
 
     def __eq__(self, other):
-        # c = copy(self)
-        self.operator = 0
-        self._create_constraint(other)
-        return self
+        return Constraint(self, 0, other)
 
     def __ge__(self, other):
-        c = copy(self)
-        c.operator = 1
-        c._create_constraint(other)
-        return c
-
-    def _get(prop, attribute, name, type_str):
-        """Property creator for constraint attributes."""
-        p = property(
-            lambda self:
-            partial(prop, self, attribute, name, type_str)(),
-            lambda self, value:
-            partial(prop, self, attribute, name, type_str, value)()
-        )
-        return p
-
-    def _prop(self, attribute, name, type_str, *values):
-        """
-        Combined getter/setter for constraint attributes.
-        Effectively makes using assignment ('=') and equality comparison
-        ('==') equal.
-        """
-
-        if type(self.view) is Guide:
-            if attribute > 10:
-                raise AttributeError(
-                    f"Cannot use attribute '{name}' with a layout guide")
-
-        c = copy(self)
-        c.attribute = attribute
-        c.attribute_name = name
-        c.attribute_type = type_str
-        return (c == values[0]) if len(values) else c
-
-    # Attribute properties - numbers are
-    # Apple NSLayoutConstraint constants
-
-    # Magical code contains three letters:
-    #   1. Position/Size
-    #   2. Horizontal/Vertical/NA
-    #   3. Absolute/Relative/NA
-    # These are used to check constraint
-    # compatibility
-    left = _get(_prop, 1, 'left', 'PHA')
-    right = _get(_prop, 2, 'right', 'PHA')
-    top = _get(_prop, 3, 'top', 'PVN')
-    bottom = _get(_prop, 4, 'bottom', 'PVN')
-    leading = _get(_prop, 5, 'leading', 'PHR')
-    trailing = _get(_prop, 6, 'trailing', 'PHR')
-    width = _get(_prop, 7, 'width', 'SNN')
-    height = _get(_prop, 8, 'height', 'SNN')
-    center_x = _get(_prop, 9, 'center_x', 'PHN')
-    center_y = _get(_prop, 10, 'center_y', 'PVN')
-    last_baseline = _get(_prop, 11, 'last_baseline', 'PVN')
-    first_baseline = _get(_prop, 12, 'first_baseline', 'PVN')
-    left_margin = _get(_prop, 13, 'left_margin', 'PHA')
-    right_margin = _get(_prop, 14, 'right_margin', 'PHA')
-    top_margin = _get(_prop, 15, 'top_margin', 'PVN')
-    bottom_margin = _get(_prop, 16, 'bottom_margin', 'PVN')
-    leading_margin = _get(_prop, 17, 'leading_margin', 'PHR')
-    trailing_margin = _get(_prop, 18, 'trailing_margin', 'PHR')
-
-    # Padding attributes have different
-    # property setup because of the additional
-    # constant needed
-
-    @prop
-    def left_padding(self, *values):
-        c = copy(self)
-        c = c.left
-        c._constant -= c.margin_inset().leading
-        return (c == values[0]) if len(values) else c
-
-    @prop
-    def right_padding(self, *values):
-        c = copy(self)
-        c = c.right
-        c._constant += c.margin_inset().trailing
-        return (c == values[0]) if len(values) else c
-
-    @prop
-    def top_padding(self, *values):
-        c = copy(self)
-        c = c.top
-        c._constant -= c.margin_inset().top
-        return (c == values[0]) if len(values) else c
-
-    @prop
-    def bottom_padding(self, *values):
-        c = copy(self)
-        c = c.bottom
-        c._constant += c.margin_inset().bottom
-        return (c == values[0]) if len(values) else c
-
-    @prop
-    def leading_padding(self, *values):
-        c = copy(self)
-        c = c.leading
-        c._constant -= c.margin_inset().leading
-        return (c == values[0]) if len(values) else c
-
-    @prop
-    def trailing_padding(self, *values):
-        c = copy(self)
-        c = c.trailing
-        c._constant += c.margin_inset().trailing
-        return (c == values[0]) if len(values) else c
+        return Constraint(self, 1, other)
 
     def margin_inset(self):
         return SimpleNamespace(
@@ -248,6 +224,7 @@ class At:
         return At(view=SimpleNamespace(
             objc_instance=self.view.objc_instance.safeAreaLayoutGuide(),
             name='Safe area',
+            guide_type='safe_area',
             superview=self.view))
 
     @property
@@ -255,59 +232,193 @@ class At:
         return At(view=SimpleNamespace(
             objc_instance=self.view.objc_instance.layoutMarginsGuide(),
             name='Margins',
+            guide_type='margins',
             superview=self.view))
 
-    @objc_util.on_main_thread
-    def _create_constraint(self, other):
+    def priority(self, value):
+        """
+        Returns a builder that creates constraints with the given priority,
+        expressed as an integer between 0 and 1000, where 1000 means a
+        required constraint, and values 0-999 optional constraints.
+
+        For example:
+
+            view.at.priority(500).width == 300
+        """
+        if type(value) is not int or value < 0 or value > 1000:
+            raise ValueError(
+                'priority must be an integer in the range [0, 1000]')
+        return At(self.view, value)
+
+    @property
+    def is_ambiguous(self):
+        '''Returns true if the constraints for this view are ambiguous
+        (position and size are not defined in a way that can be resolved by the
+        system.)'''
+        return self.view.objc_instance.hasAmbiguousLayout()
+
+    def exercise_ambiguity(self):
+        self.view.objc_instance.exerciseAmbiguityInLayout()
+
+    def __str__(self):
+        view = self.view.name if self.view.name else type(self.view).__name__
+
+        multiplier_str = f' * {self.multiplier}' \
+            if self.multiplier != 1 else ''
+
+        constant_str = ''
+        if self.constant < 0:
+            constant_str = f' - {abs(self.constant)}'
+        elif self.constant > 0:
+            constant_str = f' + {self.constant}'
+
+        return f'{view}.{self.attribute_name}{multiplier_str}{constant_str}'
+
+
+for code, name, type_str, guide in ATTRIBUTES:
+    setattr(At, name, Attribute(code, name, type_str, guide))
+for name, attribute_name, direction in PADDINGS:
+    attribute = getattr(At, attribute_name)
+    setattr(At, name, Attribute(
+        attribute.code, attribute.name, attribute.type_str, attribute.guide,
+        padding=direction))
+
+
+class Constraint:
+    """
+    Record of a constraint created by comparing `At` attributes. Only the
+    constant and the priority can be changed after creation.
+    """
+
+    __slots__ = ('view', 'attribute', 'attribute_name', 'attribute_type',
+                 'operator', 'other_view', 'other_attribute',
+                 'other_attribute_name', 'other_attribute_type',
+                 'multiplier', '_description', '_constant', '_priority',
+                 '_objc_ref', '__weakref__')
+
+    def __init__(self, at, operator, other):
+        self.view = at.view
+        self.attribute = at.attribute
+        self.attribute_name = at.attribute_name
+        self.attribute_type = at.attribute_type
+        self.operator = operator
+        self._description = None
+        self._priority = at._priority
+        self._objc_ref = None
+
         if isinstance(other, At):
             self.other_view = other.view
             self.other_attribute = other.attribute
             self.other_attribute_name = other.attribute_name
             self.other_attribute_type = other.attribute_type
-            self.constant = other.constant
             self.multiplier = other.multiplier
+            self._constant = other._constant
         elif isinstance(other, (int, float)):
-            self.constant = other
+            self.other_view = None
+            self.other_attribute = 0
+            self.other_attribute_name = 'na'
+            self.other_attribute_type = 'NNN'
+            self.multiplier = 1
+            self._constant = other
         else:
             raise TypeError(
                 f'Cannot use object of type {str(type(other))} in a constraint'
                 f' comparison: ' + str(other))
 
-        for i in range(3):
-            t = self.attribute_type
-            ot = self.other_attribute_type
-            if t[i] == 'N' or ot[i] == 'N':
-                continue
-            if t[i] != ot[i]:
-                raise TypeError(
-                    f'Incompatible attributes in constraint: {str(self)}')
+        if not COMPATIBLE[self.attribute][self.other_attribute]:
+            raise TypeError(
+                f'Incompatible attributes in constraint: {str(self)}')
 
-        try:
-            view_first_seen = \
-                self.view.objc_instance.translatesAutoresizingMaskIntoConstraints()
-        except AttributeError:
-            view_first_seen = False
-        if view_first_seen:
-            self.view.objc_instance.setTranslatesAutoresizingMaskIntoConstraints_(
-                False)
-            # C._set_defaults(self.view)
-            # if type(self.view) in C.autofit_types:
-            # self.size_to_fit()
+        pending = batch.pending()
+        if pending is not None:
+            pending.append(self)
+        else:
+            backend.activate([self])
 
-        objc_constraint = NSLayoutConstraint. \
-            PG_constraintWithItem_attribute_relatedBy_toItem_attribute_multiplier_constant_priority_(
-            self.view.objc_instance,
-            self.attribute,
-            self.operator,
-            None if not self.other_view else self.other_view.objc_instance,
-            self.other_attribute,
-            self.multiplier,
-            self.constant,
-            self._priority
-        )
+    @classmethod
+    def _from_spec(cls, view, attribute, operator, other_view,
+            other_attribute, multiplier, constant, priority):
+        """Creates the record from already validated values, without
+        activating it."""
+        self = cls.__new__(cls)
+        self.view = view
+        self.attribute = attribute
+        self.attribute_name = ATTRIBUTE_NAMES[attribute]
+        self.attribute_type = ATTRIBUTE_TYPES[attribute]
+        self.operator = operator
+        self.other_view = other_view
+        self.other_attribute = other_attribute
+        self.other_attribute_name = ATTRIBUTE_NAMES[other_attribute]
+        self.other_attribute_type = ATTRIBUTE_TYPES[other_attribute]
+        self.multiplier = multiplier
+        self._description = None
+        self._constant = constant
+        self._priority = priority
+        self._objc_ref = None
+        return self
 
-        objc_constraint.setActive_(True)
-        self.description = str(objc_constraint._deallocSafeDescription())
+    @property
+    def objc_constraint(self):
+        """
+        The NSLayoutConstraint created for this constraint, or None if it
+        has not been created yet.
+
+        The constraint is found through a weak reference held by this object,
+        falling back to the registry of the view, and only then to a search
+        of the view hierarchy.
+        """
+        if self._objc_ref is None:
+            return None
+        objc_constraint = self._objc_ref()
+        if objc_constraint is None:
+            objc_constraint = constraint_registry(self.view).get(self)
+        if objc_constraint is None and self._description is not None:
+            objc_constraint = find_constraint(self.view, self._description)
+        if objc_constraint is not None:
+            self._objc_ref = weakref.ref(objc_constraint)
+        return objc_constraint
+
+    @property
+    def description(self):
+        """
+        Description of the NSLayoutConstraint, or None if it has not been
+        created yet. Read from the constraint on first use, and kept, so
+        that `find_constraint` can look the constraint up by it, until the
+        constant or the priority is changed.
+        """
+        if self._description is None:
+            objc_constraint = self.objc_constraint
+            if objc_constraint is not None:
+                self._description = str(
+                    objc_constraint._deallocSafeDescription())
+        return self._description
+
+    def _set_objc_constraint(self, objc_constraint, description=None):
+        self._description = description
+        self._objc_ref = weakref.ref(objc_constraint)
+        constraint_registry(self.view).add(self, objc_constraint)
+        if self.other_view is not None:
+            constraint_registry(self.other_view).add(
+                self, objc_constraint, second=True)
+
+    @property
+    def constant(self):
+        """
+        Constant part of the constraint equation:
+          `target.attribute == source.attribute * multiplier + constant`.
+        This is the only part of the equation that can be changed
+        after the constraint has been created, and the change is applied
+        to the live constraint.
+        """
+        return self._constant
+
+    @constant.setter
+    def constant(self, value):
+        self._constant = value
+        objc_constraint = self.objc_constraint
+        if objc_constraint is not None:
+            objc_constraint.setConstant_(value)
+            self._description = None
 
     def priority(self, *value):
         """
@@ -316,22 +427,19 @@ class At:
         between 0 and 1000, where 1000 means a required constraint,
         and values 0-999 optional constraints.
 
-        For example:
-
-            view.at.priority(500).width == 300
-
         Note: You cannot change priority between required and optional after
         present(), but you can change between different optional priority
         levels.
         """
+        objc_constraint = self.objc_constraint
         if len(value) == 0:
-            return objc_constraint.priority() if self.objc_constraint else None
+            return objc_constraint.priority() if objc_constraint else None
         value = value[0]
         if type(value) is not int or value < 0 or value > 1000:
             raise ValueError(
                 'priority must be an integer in the range [0, 1000]')
-        if self.objc_constraint:
-            previous_value = self.objc_constraint.priority()
+        if objc_constraint:
+            previous_value = objc_constraint.priority()
             if self.view.on_screen and \
                     ((value == 1000 and \
                       previous_value != 1000) or \
@@ -340,18 +448,830 @@ class At:
                 raise ValueError(
                     'Cannot change priority value between required (1000) '
                     'and lower value')
-            self.objc_constraint.setPriority_(value)
+            objc_constraint.setPriority_(value)
+            self._description = None
+        self._priority = value
         return self
 
-    @property
-    def is_ambiguous(self):
-        '''Returns true if the constraints for this view are ambiguous
-        (position and size are not defined in a way that can be resolved by the
-        system.)'''
-        return self.view.objc_instance.hasAmbiguousLayout()
+    def __str__(self):
+        operators = ['<=', '==', '>=']
 
-    def exercise_ambiguity(self):
-        self.view.objc_instance.exerciseAmbiguityInLayout()
+        view = self.view.name if self.view.name else type(self.view).__name__
+
+        operator = operators[self.operator + 1]
+
+        other_view = self.other_view.name if \
+            self.other_view and self.other_view.name \
+            else (type(
+            self.other_view).__name__ if self.other_view is not None else '')
+
+        other_attribute_str = '' \
+            if self.other_attribute == 0 \
+            else f'.{self.other_attribute_name} '
+
+        multiplier_str = f'* {self.multiplier} ' \
+            if self.multiplier != 1 else ''
+
+        constant_str = ''
+        if self.constant < 0:
+            constant_str = f'- {abs(self.constant)}'
+        elif self.constant > 0:
+            constant_str = f'+ {self.constant}'
+
+        return (f'{view}.{self.attribute_name} {operator} '
+                f'{other_view}{other_attribute_str}'
+                f'{multiplier_str}{constant_str}')
+
+
+class profile:
+    """
+    Context manager that counts and times anchor's layout work within the
+    block:
+
+        with anchor.profile() as p:
+            create_ui()
+        print(p.stats())
+        p.write_collapsed('layout.folded')
+
+    Profiled events are constraint creation, `find_constraint`,
+    `find_constraints`, the `sizeThatFits_` calls of `fit`,
+    `GridView.layout` and main thread dispatches. `stats()` returns the
+    counts and times per event, per view and per call site, i.e. the line
+    outside anchor that led to the event. `collapsed()` returns the same
+    as collapsed stacks for flame graph tools, in microseconds of self time.
+
+    Like `batch`, the profile is global rather than per thread, so that
+    work done on the main thread is included.
+    """
+
+    _current = None
+
+    def __init__(self):
+        self.events = defaultdict(lambda: [0, 0.0])
+        self.views = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+        self.sites = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+        self.stacks = defaultdict(float)
+        self._stack = []
+        self._site = ()
+
+    def __enter__(self):
+        self._previous = profile._current
+        profile._current = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        profile._current = self._previous
+
+    def _call(self, event, view, func, args, kwargs):
+        stack = self._stack
+        if any(entry[0] == event for entry in stack):
+            return func(*args, **kwargs)
+        if not stack:
+            self._site = self._call_site()
+        entry = [event, 0.0]
+        stack.append(entry)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += seconds
+            self._record(
+                event, view, seconds, seconds - entry[1],
+                self._site + tuple(entry[0] for entry in stack) + (event,))
+
+    def _record(self, event, view, seconds, self_seconds, path):
+        for totals in (
+                self.events[event],
+                self.views[self._view_label(view)][event],
+                self.sites[path[len(self._site) - 1] if self._site
+                           else '<unknown>'][event]):
+            totals[0] += 1
+            totals[1] += seconds
+        self.stacks[path] += self_seconds
+
+    @staticmethod
+    def _call_site():
+        """Returns the stack of the frames outside anchor, outermost
+        first."""
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        site = []
+        while frame is not None:
+            code = frame.f_code
+            site.append(
+                f'{code.co_filename.rsplit("/", 1)[-1]}:{code.co_name}:'
+                f'{frame.f_lineno}')
+            frame = frame.f_back
+        return tuple(reversed(site))
+
+    @staticmethod
+    def _view_label(view):
+        if view is None:
+            return '<none>'
+        name = getattr(view, 'name', None)
+        return f'{type(view).__name__} {name or hex(id(view))}'
+
+    def stats(self):
+        """Returns the counts and times in seconds as a dict with 'events',
+        'views' and 'sites', the last two with the events per view or call
+        site."""
+        def totals(events):
+            return {
+                event: {'count': count, 'seconds': seconds}
+                for event, (count, seconds) in events.items()}
+        return {
+            'events': totals(self.events),
+            'views': {
+                view: totals(events) for view, events in self.views.items()},
+            'sites': {
+                site: totals(events) for site, events in self.sites.items()},
+        }
+
+    def collapsed(self):
+        """Returns the profile as collapsed stacks, one `frame;frame value`
+        line per stack, with self time in microseconds as the value."""
+        return '\n'.join(
+            f'{";".join(path)} {round(seconds * 1e6)}'
+            for path, seconds in self.stacks.items()) + '\n'
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as file:
+            file.write(self.collapsed())
+
+
+def profiled(event, view=lambda args: args[0]):
+    """Decorator that records calls of the function as `event` when a
+    `profile` is active. `view` returns the view concerned from the
+    arguments."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            current = profile._current
+            if current is None:
+                return func(*args, **kwargs)
+            return current._call(event, view(args), func, args, kwargs)
+        return wrapper
+
+    return decorator
+
+
+def on_main_thread(func):
+    """`objc_util.on_main_thread` that is profiled as a dispatch."""
+    return profiled('main_thread_dispatch', view=lambda args: None)(
+        objc_util.on_main_thread(func))
+
+
+class UIKitBackend:
+    """
+    Creates NSLayoutConstraints and leaves the layout to UIKit. This is the
+    default value of the module-level `backend`, which is responsible for
+    turning `Constraint` records into live constraints.
+
+    A backend implements `activate(constraints)`, which creates and
+    activates the constraints for a list of `Constraint` records and hands
+    each of them its constraint object with `_set_objc_constraint`, and
+    `deactivate(objc_constraints)` and `reactivate(objc_constraints)` for a
+    list of those constraint objects. With `active=False`, `activate` only
+    creates the constraint objects.
+    The constraint objects respond to the NSLayoutConstraint methods used by
+    anchor: `active`, `priority`, `setPriority_`, `constant`,
+    `setConstant_` and `_deallocSafeDescription`.
+    """
+
+    @on_main_thread
+    def activate(self, constraints, active=True):
+        create = self.create
+        if profile._current is not None:
+            create = profiled(
+                'create_constraint', view=lambda args: args[0].view)(create)
+        views = {id(constraint.view): constraint.view
+                 for constraint in constraints}
+        for view in views.values():
+            self.prepare(view)
+        objc_constraints = [
+            create(constraint)
+            for constraint in constraints]
+        if active:
+            objc_class('NSLayoutConstraint').activateConstraints_(
+                objc_constraints)
+        for constraint, objc_constraint in zip(constraints, objc_constraints):
+            constraint._set_objc_constraint(objc_constraint)
+
+    @on_main_thread
+    def deactivate(self, objc_constraints):
+        objc_class('NSLayoutConstraint').deactivateConstraints_(
+            objc_constraints)
+
+    @on_main_thread
+    def reactivate(self, objc_constraints):
+        objc_class('NSLayoutConstraint').activateConstraints_(
+            objc_constraints)
+
+    def prepare(self, view):
+        """Turns off the autoresizing mask constraints of a view that is the
+        first item of constraints, once per `activate` call, to be called on
+        the main thread."""
+        try:
+            view_first_seen = \
+                view.objc_instance.translatesAutoresizingMaskIntoConstraints()
+        except AttributeError:
+            view_first_seen = False
+        if view_first_seen:
+            view.objc_instance.setTranslatesAutoresizingMaskIntoConstraints_(
+                False)
+
+    def create(self, constraint):
+        """Creates the inactive NSLayoutConstraint, to be called on the main
+        thread."""
+        view = constraint.view
+        other_view = constraint.other_view
+        return objc_class('NSLayoutConstraint'). \
+            PG_constraintWithItem_attribute_relatedBy_toItem_attribute_multiplier_constant_priority_(
+            view.objc_instance,
+            constraint.attribute,
+            constraint.operator,
+            None if not other_view else other_view.objc_instance,
+            constraint.other_attribute,
+            constraint.multiplier,
+            constraint.constant,
+            constraint._priority
+        )
+
+
+backend = UIKitBackend()
+
+
+class batch:
+    """
+    Context manager that collects the constraints created within the block,
+    and activates them together with a single main thread call when the
+    block exits:
+
+        with anchor.batch():
+            for view in views:
+                view.dock.top()
+
+    Constraints in a batch have no `objc_constraint` until the block exits.
+    Nested batches are activated when the outermost block exits. If the
+    block raises an exception, the collected constraints are discarded.
+
+    The batch is global rather than per thread, so that constraints created
+    in functions that run on the main thread are collected as well. Only
+    `apply_async` collects per thread, for the requests it runs.
+    """
+
+    _constraints = None
+    _local = threading.local()
+
+    @classmethod
+    def pending(cls):
+        """Returns the list of constraints waiting for activation, or None if
+        no batch is in progress."""
+        constraints = getattr(cls._local, 'constraints', None)
+        return cls._constraints if constraints is None else constraints
+
+    @classmethod
+    def _replace(cls, constraints):
+        """Replaces the list of pending constraints, and returns the
+        previous one."""
+        if getattr(cls._local, 'constraints', None) is not None:
+            previous = cls._local.constraints
+            cls._local.constraints = constraints
+        else:
+            previous = cls._constraints
+            cls._constraints = constraints
+        return previous
+
+    def __enter__(self):
+        self.outermost = batch.pending() is None
+        if self.outermost:
+            batch._constraints = []
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.outermost:
+            return
+        constraints = batch._constraints
+        batch._constraints = None
+        if constraints and exc_type is None:
+            backend.activate(constraints)
+        if _needs_layout:
+            layout_now()
+
+
+_needs_layout = {}
+
+
+def set_needs_layout(view):
+    """
+    Marks the view as needing its `layout` method to run. The layouts of
+    all marked views run once, parents first, when the current `batch`
+    ends, or on the next turn of the run loop, however many times the views
+    were marked:
+
+        for reading in readings:
+            grid.add_subview(reading_view(reading))  # grid laid out once
+
+    `GridView` marks itself when subviews are added or removed.
+    """
+    if not _needs_layout:
+        # Scheduled even inside a batch, as Layout, group and template
+        # collect constraints without ending one.
+        ui.delay(layout_now, 0)
+    _needs_layout[id(view)] = view
+
+
+def layout_now():
+    """Runs the pending layouts right away."""
+    while _needs_layout:
+        views = sorted(_needs_layout.values(), key=_depth)
+        _needs_layout.clear()
+        for view in views:
+            view.layout()
+
+
+def _depth(view):
+    depth = 0
+    while view.superview is not None:
+        view = view.superview
+        depth += 1
+    return depth
+
+
+class Layout:
+    """
+    Keeps the constraints created by a layout function in sync with the
+    function, instead of removing and recreating all of them whenever the
+    layout changes:
+
+        def cell_constraints(grid):
+            for cell, x in zip(grid.subviews, grid.positions):
+                cell.at.leading == grid.at.leading + x
+                ...
+
+        cell_layout = anchor.Layout(cell_constraints)
+        cell_layout.update(grid)
+
+    `update` calls the function with the given arguments. The constraints
+    the function creates are not activated, but compared with the live
+    constraints from the previous update. Identical constraints are kept,
+    constraints that only differ in the constant get the new constant, and
+    the rest are removed or added, each with one call. The `Constraint`
+    objects created by the function stay valid, as they take over the live
+    constraints they match.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.constraints = []
+
+    def update(self, *args, **kwargs):
+        """ Calls the layout function and applies the changes. Returns the
+        number of constraints kept, updated, added and removed. """
+        desired = []
+        previous = batch._replace(desired)
+        try:
+            self.func(*args, **kwargs)
+        finally:
+            batch._replace(previous)
+
+        live = defaultdict(list)
+        for constraint in self.constraints:
+            live[self._key(constraint)].append(constraint)
+        matched = []
+        added = []
+        for constraint in desired:
+            candidates = live.get(self._key(constraint))
+            if candidates:
+                matched.append((candidates.pop(), constraint))
+            else:
+                added.append(constraint)
+        removed = [
+            constraint
+            for candidates in live.values()
+            for constraint in candidates]
+
+        updated = self._apply(matched, added, removed)
+        self.constraints = desired
+        return SimpleNamespace(
+            kept=len(matched) - updated, updated=updated,
+            added=len(added), removed=len(removed))
+
+    def clear(self):
+        """ Removes all the constraints of the layout. """
+        self._apply([], [], self.constraints)
+        self.constraints = []
+
+    @on_main_thread
+    def _apply(self, matched, added, removed):
+        """ Returns the number of matched constraints whose constant was
+        updated. Matches that are no longer live, because they were removed
+        with `remove_constraints` or deactivated by UIKit when a view was
+        removed, are recreated instead, and are taken out of `matched`."""
+        live = []
+        for old, new in matched:
+            objc_constraint = old.objc_constraint
+            if objc_constraint is not None and objc_constraint.active():
+                live.append((old, new, objc_constraint))
+            else:
+                removed.append(old)
+                added.append(new)
+        matched[:] = [(old, new) for old, new, _ in live]
+
+        objc_constraints = [
+            objc_constraint for objc_constraint in (
+                constraint.objc_constraint for constraint in removed)
+            if objc_constraint is not None]
+        if objc_constraints:
+            backend.deactivate(objc_constraints)
+        _forget(removed)
+
+        updated = 0
+        for old, new, objc_constraint in live:
+            _unregister(old)
+            new._set_objc_constraint(
+                objc_constraint,
+                old._description if new._constant == old._constant else None)
+            old._objc_ref = None
+            old._description = None
+            if new._constant != old._constant:
+                objc_constraint.setConstant_(new._constant)
+                updated += 1
+
+        if added:
+            pending = batch.pending()
+            if pending is not None:
+                pending.extend(added)
+            else:
+                backend.activate(added)
+        return updated
+
+    @staticmethod
+    def _key(constraint):
+        """Everything but the constant."""
+        return (
+            _item_key(constraint.view), constraint.attribute,
+            constraint.operator,
+            _item_key(constraint.other_view), constraint.other_attribute,
+            constraint.multiplier, constraint._priority)
+
+
+def _item_key(view):
+    """Identifies a view, or the safe area and margins of a view, which are
+    new objects every time."""
+    if view is None:
+        return None
+    guide_type = getattr(view, 'guide_type', None)
+    if guide_type in ('safe_area', 'margins'):
+        return id(view.superview), guide_type
+    return id(view)
+
+
+class group:
+    """
+    Context manager that creates the constraints within the block as a named
+    group, which can then be switched on and off as a unit:
+
+        with anchor.group('regular'):
+            side_panel.dock.leading()
+        with anchor.group('constrained'):
+            main_frame.dock.all()
+
+    All the constraints of a group are activated or deactivated with a
+    single call. The groups named 'regular' and 'constrained' are switched
+    automatically to match the horizontal size class, whenever `Dimensions`
+    reports a change in it. Call `group.update()` in the `layout` method of
+    your root view to have the size class checked on rotation.
+
+    Using the same name again adds constraints to the group. Constraints of
+    an inactive group are created without activating them. `clear` removes
+    the constraints of a group.
+    """
+
+    SIZE_CLASSES = ('constrained', 'regular')
+
+    _groups = {}
+    _inactive = set()
+    size_class = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.previous = batch._replace([])
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        constraints = batch._replace(self.previous)
+        if not constraints or exc_type is not None:
+            return
+        name = self.name
+        if name in group.SIZE_CLASSES:
+            group.update()
+        group._groups.setdefault(name, []).extend(constraints)
+        backend.activate(constraints, active=name not in group._inactive)
+
+    @classmethod
+    def constraints(cls, name):
+        """Returns the constraints of the named group."""
+        return list(cls._groups.get(name, ()))
+
+    @classmethod
+    def is_active(cls, name):
+        return name not in cls._inactive
+
+    @classmethod
+    def clear(cls, name):
+        """Deactivates and forgets the constraints of the named group.
+        Whether the group is switched on or off is kept for constraints
+        added later."""
+        constraints = cls._groups.pop(name, ())
+        objc_constraints = [
+            objc_constraint for objc_constraint in (
+                constraint.objc_constraint for constraint in constraints)
+            if objc_constraint is not None]
+        if objc_constraints:
+            backend.deactivate(objc_constraints)
+        _forget(constraints)
+
+    @classmethod
+    def activate(cls, *names):
+        cls.switch(activate=names)
+
+    @classmethod
+    def deactivate(cls, *names):
+        cls.switch(deactivate=names)
+
+    @classmethod
+    def switch(cls, activate=(), deactivate=()):
+        """Deactivates and activates the named groups, with one call for the
+        groups to deactivate and one for the groups to activate. Groups that
+        are already in the requested state are left alone."""
+        deactivate = [name for name in deactivate if name not in cls._inactive]
+        activate = [name for name in activate if name in cls._inactive]
+        cls._inactive.update(deactivate)
+        cls._inactive.difference_update(activate)
+        deactivate = cls._objc_constraints(deactivate)
+        activate = cls._objc_constraints(activate)
+        if deactivate or activate:
+            cls._set_active(deactivate, activate)
+
+    @classmethod
+    def update(cls):
+        """Switches the size class groups if the horizontal size class has
+        changed since the last check. This is subscribed to `Dimensions`."""
+        size_class = Dimensions.horizontal_size_class()
+        if size_class != cls.size_class:
+            cls._size_class_changed(size_class)
+
+    @classmethod
+    def _size_class_changed(cls, size_class):
+        cls.size_class = size_class
+        cls.switch(
+            activate=[size_class],
+            deactivate=[
+                name for name in cls.SIZE_CLASSES if name != size_class])
+
+    @classmethod
+    def _prune(cls):
+        """Drops the constraints removed with `remove_constraints`, and the
+        groups left empty."""
+        for name, constraints in list(cls._groups.items()):
+            constraints[:] = [
+                constraint for constraint in constraints
+                if constraint._objc_ref is not None]
+            if not constraints:
+                del cls._groups[name]
+
+    @classmethod
+    def _objc_constraints(cls, names):
+        """Constraints of the groups, except the ones that have been removed
+        with `remove_constraints`."""
+        objc_constraints = []
+        for name in names:
+            for constraint in cls._groups.get(name, ()):
+                objc_constraint = constraint.objc_constraint
+                if objc_constraint is not None:
+                    objc_constraints.append(objc_constraint)
+        return objc_constraints
+
+    @staticmethod
+    @on_main_thread
+    def _set_active(deactivate, activate):
+        if deactivate:
+            backend.deactivate(deactivate)
+        if activate:
+            backend.reactivate(activate)
+
+
+def batched(func):
+    """Decorator that runs the function within a `batch`."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with batch():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def transaction(func):
+    """Decorator that runs the function on the main thread, within a
+    `batch`, so that the anchors are resolved and the constraints created
+    and activated with a single main thread call. Within an open batch, the
+    function joins the batch and runs right away, leaving the main thread
+    call to the end of the batch."""
+    dispatched = on_main_thread(batched(func))
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if batch.pending() is not None:
+            return func(*args, **kwargs)
+        return dispatched(*args, **kwargs)
+
+    return wrapper
+
+
+def _at(view):
+    """The `at` of the view, enabling the view if it is not already."""
+    return enable(view).at
+
+
+# Executor that apply_async uses to wait for the main thread, instead of
+# blocking the event loop. None for a single worker thread.
+main_thread_executor = None
+
+_async_requests = {}
+
+
+async def apply_async(func, *args, **kwargs):
+    """
+    Awaitable version of calling `func(*args, **kwargs)` on the main
+    thread, for use in asyncio coroutines:
+
+        await anchor.apply_async(title.dock.bottom_trailing)
+
+    The event loop is not blocked while the main thread runs the function.
+    All the requests made during one turn of the event loop are run
+    together, with a single trip to the main thread, and the constraints
+    they create are activated together. Returns the return value of the
+    function, or raises its exception, in which case the constraints it
+    created are discarded. The constraints are discarded as well if the
+    awaiting task is cancelled before they are activated.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    requests = _async_requests.get(loop)
+    if requests is None:
+        requests = _async_requests[loop] = []
+        loop.call_soon(_submit_async_requests, loop)
+    future = loop.create_future()
+    requests.append((func, args, kwargs, future))
+    return await future
+
+
+class async_batch(batch):
+    """
+    Asynchronous version of `batch`. The constraints created within the
+    block are activated with `apply_async` when the block exits, together
+    with everything else requested during the same turn of the event loop:
+
+        async with anchor.async_batch():
+            for view in views:
+                view.at.height == 44
+
+    As with `batch`, the collected constraints are global, so the block
+    should not await anything.
+    """
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if not self.outermost:
+            return
+        constraints = batch._constraints
+        batch._constraints = None
+        if constraints and exc_type is None:
+            await apply_async(_extend_batch, constraints)
+
+
+def _extend_batch(constraints):
+    batch.pending().extend(constraints)
+
+
+def _submit_async_requests(loop):
+    global main_thread_executor
+    requests = [
+        request for request in _async_requests.pop(loop)
+        if not request[3].cancelled()]
+    if not requests:
+        return
+    if main_thread_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        main_thread_executor = ThreadPoolExecutor(max_workers=1)
+    calls = [request[:3] + (request[3].cancelled,) for request in requests]
+    futures = [request[3] for request in requests]
+    done = loop.run_in_executor(
+        main_thread_executor, _run_async_requests, calls)
+
+    def resolve(done):
+        try:
+            outcomes = done.result()
+        except Exception as error:
+            outcomes = [(None, error)] * len(futures)
+        for future, (result, error) in zip(futures, outcomes):
+            if future.cancelled():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    done.add_done_callback(resolve)
+
+
+@on_main_thread
+def _run_async_requests(calls):
+    """Runs the functions, collecting the constraints of each in a list of
+    its own, and activates the constraints of the ones that succeed
+    together. Requests whose `cancelled()` returns True by then, as the
+    task awaiting them was cancelled, are skipped or have their
+    constraints discarded. Returns (result, exception) for each
+    function."""
+    outcomes = []
+    succeeded = []
+    for func, args, kwargs, cancelled in calls:
+        if cancelled():
+            outcomes.append((None, None))
+            continue
+        constraints = batch._local.constraints = []
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            outcomes.append((None, error))
+            continue
+        finally:
+            batch._local.constraints = None
+        succeeded.append((constraints, cancelled))
+        outcomes.append((result, None))
+    activate = [
+        constraint
+        for constraints, cancelled in succeeded if not cancelled()
+        for constraint in constraints]
+    if activate:
+        backend.activate(activate)
+    return outcomes
+
+
+@profiled('sizeThatFits_')
+def _size_that_fits(view):
+    return view.objc_instance.sizeThatFits_((0, 0))
+
+
+# Natural sizes of labels and buttons measured by fit, by
+# (class, text, font, number of lines, line break mode, fitting size).
+# Views without text and buttons with images are always measured, as the
+# key does not cover their content.
+fitted_sizes = {}
+fitted_sizes_limit = 1024
+
+
+def _fit_sizes(views):
+    """Returns the natural size of each view as a (width, height) tuple,
+    measuring labels and buttons with the same text and font only once. To
+    be called on the main thread."""
+    sizes = []
+    for view in views:
+        view_type = type(view)
+        key = None
+        if view_type in Dock.extra_width_types:
+            text = getattr(view, 'text', None) or getattr(view, 'title', None)
+            if text and getattr(view, 'image', None) is None and getattr(
+                    view, 'background_image', None) is None:
+                key = (
+                    view_type, text, getattr(view, 'font', None),
+                    getattr(view, 'number_of_lines', None),
+                    getattr(view, 'line_break_mode', None),
+                    (0, 0))
+        size = fitted_sizes.get(key) if key is not None else None
+        if size is None:
+            fitted = _size_that_fits(view)
+            size = (fitted.width, fitted.height)
+            if key is not None:
+                if len(fitted_sizes) >= fitted_sizes_limit:
+                    fitted_sizes.clear()
+                fitted_sizes[key] = size
+        if view_type in Dock.extra_width_types:
+            margins = view.at.margin_inset()
+            size = (size[0] + margins.leading + margins.trailing, size[1])
+        sizes.append(size)
+    return sizes
 
 
 class Dock:
@@ -360,6 +1280,8 @@ class Dock:
     its superview.
     """
 
+    __slots__ = ('view',)
+
     def __init__(self, view):
         self.view = view
 
@@ -375,18 +1297,9 @@ class Dock:
 
     extra_width_types = [ui.Label, ui.Button]
 
-    @objc_util.on_main_thread
     def fit(self):
         "Set size constraints according to the view‘s preferred size."
-        view = self.view
-        size = view.objc_instance.sizeThatFits_((0, 0))
-        extra_width = 0
-        if type(view) in self.extra_width_types:
-            margins = self.view.at.margin_inset()
-            extra_width = margins.leading + margins.trailing
-        self.view.at.width == size.width + extra_width
-        self.view.at.height == size.height
-        return view
+        return fit(self.view)
 
     TIGHT = 0
     MARGIN = 1
@@ -394,170 +1307,194 @@ class Dock:
     default_fit = MARGIN
 
     def _fit(self, fit):
-        s = self.superview
-        enable(s)
+        at = _at(self.superview)
         if fit == Dock.TIGHT:
-            return s.at
+            return at
         elif fit == Dock.MARGIN:
-            return s.at.margins
+            return at.margins
         elif fit == Dock.SAFE:
-            return s.at.safe_area
+            return at.safe_area
 
+    @transaction
     def all(self, constant=0, fit=default_fit):
         'Dock the view on all sides.'
-        view = self.view
+        at = self.view.at
         sf = self._fit(fit)
-        view.at.top == self._fit(fit).top + constant
-        view.at.bottom == self._fit(fit).bottom - constant
-        view.at.leading == self._fit(fit).leading + constant
+        at.top == sf.top + constant
+        at.bottom == sf.bottom - constant
+        at.leading == sf.leading + constant
 
-        view.at.trailing == self._fit(fit).trailing - constant
+        at.trailing == sf.trailing - constant
 
+    @transaction
     def center(self, share=None):
-        view = self.view
-        s = enable(self.superview)
-        view.at.center_x == s.at.center_x
-        view.at.center_y == s.at.center_y
+        at = self.view.at
+        s = _at(self.superview)
+        at.center_x == s.center_x
+        at.center_y == s.center_y
         self._set_size(share)
 
+    @transaction
     def sides(self, share=None, constant=0, fit=default_fit):
-        view = self.view
-        view.at.leading == self._fit(fit).leading + constant
-        view.at.trailing == self._fit(fit).trailing - constant
+        at = self.view.at
+        sf = self._fit(fit)
+        at.leading == sf.leading + constant
+        at.trailing == sf.trailing - constant
         self._set_size(share)
 
     horizontal = sides
 
+    @transaction
     def vertical(self, constant=0, fit=default_fit):
         at = self.view.at
-        at.top == self._fit(fit).top + constant
-        at.bottom == self._fit(fit).bottom - constant
+        sf = self._fit(fit)
+        at.top == sf.top + constant
+        at.bottom == sf.bottom - constant
 
+    @transaction
     def between(self,
             top=None, bottom=None,
             leading=None, trailing=None,
             fit=default_fit, constant=0):
         at = self.view.at
+        if not (top and bottom and leading and trailing):
+            sf = self._fit(fit)
         if top:
-            enable(top)
             at.top == (
-                top.at.bottom if fit == Dock.TIGHT
-                else top.at.bottom_padding
+                _at(top).bottom if fit == Dock.TIGHT
+                else _at(top).bottom_padding
                      + constant)
         else:
-            at.top == self._fit(fit).top + constant
+            at.top == sf.top + constant
         if bottom:
-            enable(bottom)
             at.bottom == (
-                bottom.at.top if fit == Dock.TIGHT
-                else bottom.at.top_padding
+                _at(bottom).top if fit == Dock.TIGHT
+                else _at(bottom).top_padding
                      - constant)
         else:
-            at.bottom == self._fit(fit).bottom - constant
+            at.bottom == sf.bottom - constant
         if leading:
-            enable(leading)
             at.leading == (
-                leading.at.trailing if fit == Dock.TIGHT
-                else leading.at.trailing_padding
+                _at(leading).trailing if fit == Dock.TIGHT
+                else _at(leading).trailing_padding
                      + constant)
         else:
-            at.leading == self._fit(fit).leading + constant
+            at.leading == sf.leading + constant
         if trailing:
-            enable(trailing)
             at.trailing == (
-                trailing.at.leading if fit == Dock.TIGHT
-                else trailing.at.leading_padding
+                _at(trailing).leading if fit == Dock.TIGHT
+                else _at(trailing).leading_padding
                      - constant)
         else:
-            at.trailing == self._fit(fit).trailing - constant
+            at.trailing == sf.trailing - constant
 
+    @transaction
     def horizontal_between(self, top_view, bottom_view, constant=0,
             fit=default_fit):
         at = self.view.at
-        enable(top_view, bottom_view)
+        top_at = _at(top_view)
+        bottom_at = _at(bottom_view)
         self.horizontal(constant=constant, fit=fit)
         if fit == Dock.TIGHT:
-            at.top == top_view.at.bottom + constant
-            at.bottom == top_view.at.top + constant
+            at.top == top_at.bottom + constant
+            at.bottom == top_at.top + constant
         else:
-            at.top == top_view.at.bottom_padding + constant
-            at.bottom == bottom_view.at.top_padding + constant
+            at.top == top_at.bottom_padding + constant
+            at.bottom == bottom_at.top_padding + constant
 
+    @transaction
     def vertical_between(self, leading_view, trailing_view, constant=0,
             fit=default_fit):
         at = self.view.at
-        enable(leading_view, trailing_view)
+        leading_at = _at(leading_view)
+        trailing_at = _at(trailing_view)
         self.vertical(constant, fit)
         if fit == Dock.TIGHT:
-            at.leading == leading_view.at.trailing + constant
-            at.trailing == trailing_view.at.leading + constant
+            at.leading == leading_at.trailing + constant
+            at.trailing == trailing_at.leading + constant
         elif fit == Dock.MARGIN:
-            at.leading == leading_view.at.trailing_padding + constant
-            at.trailing == trailing_view.at.leading_padding + constant
+            at.leading == leading_at.trailing_padding + constant
+            at.trailing == trailing_at.leading_padding + constant
 
     def _set_size(self, share):
         if share is not None:
             share_x, share_y = share if type(share) in (list, tuple) else (
             share, share)
             at = self.view.at
-            s = enable(self.superview)
+            s = _at(self.superview)
             at.width == s.width * share_x
             at.height == s.height * share_y
 
+    @transaction
     def top(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.top == self._fit(fit).top + constant
-        at.leading == self._fit(fit).leading + constant
-        at.trailing == self._fit(fit).trailing - constant
+        sf = self._fit(fit)
+        at.top == sf.top + constant
+        at.leading == sf.leading + constant
+        at.trailing == sf.trailing - constant
         if share is not None:
-            at.height == enable(self.superview).at.height * share
+            at.height == _at(self.superview).height * share
 
+    @transaction
     def bottom(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.bottom == self._fit(fit).bottom - constant
-        at.leading == self._fit(fit).leading + constant
-        at.trailing == self._fit(fit).trailing - constant
+        sf = self._fit(fit)
+        at.bottom == sf.bottom - constant
+        at.leading == sf.leading + constant
+        at.trailing == sf.trailing - constant
         if share is not None:
-            at.height == enable(self.superview).at.height * share
+            at.height == _at(self.superview).height * share
 
+    @transaction
     def leading(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.leading == self._fit(fit).leading + constant
-        at.top == self._fit(fit).top + constant
-        at.bottom == self._fit(fit).bottom - constant
+        sf = self._fit(fit)
+        at.leading == sf.leading + constant
+        at.top == sf.top + constant
+        at.bottom == sf.bottom - constant
         if share is not None:
-            at.width == enable(self.superview).at.width * share
+            at.width == _at(self.superview).width * share
 
+    @transaction
     def trailing(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.trailing == self._fit(fit).trailing - constant
-        at.top == self._fit(fit).top + constant
-        at.bottom == self._fit(fit).bottom - constant
+        sf = self._fit(fit)
+        at.trailing == sf.trailing - constant
+        at.top == sf.top + constant
+        at.bottom == sf.bottom - constant
         if share is not None:
-            at.width == enable(self.superview).at.width * share
+            at.width == _at(self.superview).width * share
 
+    @transaction
     def top_leading(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.top == self._fit(fit).top + constant
-        at.leading == self._fit(fit).leading + constant
+        sf = self._fit(fit)
+        at.top == sf.top + constant
+        at.leading == sf.leading + constant
         self._set_size(share)
 
+    @transaction
     def top_trailing(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.top == self._fit(fit).top + constant
-        at.trailing == self._fit(fit).trailing - constant
+        sf = self._fit(fit)
+        at.top == sf.top + constant
+        at.trailing == sf.trailing - constant
         self._set_size(share)
 
+    @transaction
     def bottom_leading(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.bottom == self._fit(fit).bottom - constant
-        at.leading == self._fit(fit).leading + constant
+        sf = self._fit(fit)
+        at.bottom == sf.bottom - constant
+        at.leading == sf.leading + constant
         self._set_size(share)
 
+    @transaction
     def bottom_trailing(self, share=None, constant=0, fit=default_fit):
         at = self.view.at
-        at.bottom == self._fit(fit).bottom - constant
-        at.trailing == self._fit(fit).trailing - constant
+        sf = self._fit(fit)
+        at.bottom == sf.bottom - constant
+        at.trailing == sf.trailing - constant
         self._set_size(share)
 
 
@@ -572,99 +1509,42 @@ class Align:
         view_a.align.center_x(view_b, view_c)
     '''
 
+    __slots__ = ('view',)
+
     def __init__(self, view):
         self.view = view
 
-    def _align(self, other_views):
-        attribute_name = inspect.currentframe().f_back.f_code.co_name
+    def _align(self, attribute_name, other_views):
+        attribute = getattr(self.view.at, attribute_name)
         for other_view in other_views:
-            enable(other_view)
             last_constraint = (
-                    getattr(self.view.at, attribute_name) ==
-                    getattr(other_view.at, attribute_name))
+                    attribute == getattr(_at(other_view), attribute_name))
         return last_constraint
 
-    def left(self, *others):
-        return self._align(others)
-
-    def right(self, *others):
-        return self._align(others)
-
-    def top(self, *others):
-        return self._align(others)
-
-    def bottom(self, *others):
-        return self._align(others)
-
-    def leading(self, *others):
-        return self._align(others)
-
-    def trailing(self, *others):
-        return self._align(others)
-
-    def width(self, *others):
-        return self._align(others)
-
-    def height(self, *others):
-        return self._align(others)
-
-    def center_x(self, *others):
-        return self._align(others)
-
-    def center_y(self, *others):
-        return self._align(others)
-
-    def last_baseline(self, *others):
-        return self._align(others)
-
-    def first_baseline(self, *others):
-        return self._align(others)
-
-    def left_margin(self, *others):
-        return self._align(others)
-
-    def right_margin(self, *others):
-        return self._align(others)
-
-    def top_margin(self, *others):
-        return self._align(others)
-
-    def bottom_margin(self, *others):
-        return self._align(others)
-
-    def leading_margin(self, *others):
-        return self._align(others)
-
-    def trailing_margin(self, *others):
-        return self._align(others)
-
-    def left_padding(self, *others):
-        return self._align(others)
-
-    def right_padding(self, *others):
-        return self._align(others)
-
-    def top_padding(self, *others):
-        return self._align(others)
-
-    def bottom_padding(self, *others):
-        return self._align(others)
-
-    def leading_padding(self, *others):
-        return self._align(others)
-
-    def trailing_padding(self, *others):
-        return self._align(others)
-
+    @transaction
     def size(self, *others):
         self.width(*others)
         return self.height(*others)
 
+    @transaction
     def center(self, *others):
         self.center_x(*others)
         return self.center_y(*others)
 
 
+def _aligner(attribute_name):
+    @transaction
+    def align(self, *others):
+        return self._align(attribute_name, others)
+    align.__name__ = attribute_name
+    return align
+
+
+for name in [attribute[1] for attribute in ATTRIBUTES] + [
+        padding[0] for padding in PADDINGS]:
+    setattr(Align, name, _aligner(name))
+
+
 class ConstraintView:
 
     @property
@@ -683,45 +1563,404 @@ class ConstraintView:
 class Constrainer():
 
     def __new__(extender_subclass, *args, **kwargs):
-        target_instance = extender_subclass._builtin_class(*args, **kwargs)
-        target_instance.at = At(target_instance)
-        target_instance.align = Align(target_instance)
-        target_instance.dock = Dock(target_instance)
-        return target_instance
+        return enable(extender_subclass._builtin_class(*args, **kwargs))
+
+
+def enabled_class(name):
+    """ Returns the enabled version of the ui view class with the given
+    name, e.g. `Label`, where every new instance has `at`, `align` and
+    `dock` set. The classes are created on first use, and available as
+    attributes of this module. """
+    enabled = _enabled_classes.get(name)
+    if enabled is None:
+        value = getattr(ui, name, None)
+        if type(value) is not type or not issubclass(value, ui.View):
+            raise AttributeError(
+                f"module '{__name__}' has no attribute '{name}'")
+        enabled = _enabled_classes[name] = type(
+            name, (Constrainer,), {'_builtin_class': value})
+    return enabled
+
 
+_enabled_classes = {}
 
-# Generate enabled versions for all ui views
-for key in ui.__dict__:
-    value = getattr(ui, key, None)
-    if type(value) is type and ui.View in value.mro():
-        globals()[key] = type(key, (Constrainer,), {'_builtin_class': value})
+
+def _view_class_names():
+    return [
+        key for key, value in ui.__dict__.items()
+        if type(value) is type and issubclass(value, ui.View)
+        and key not in globals()]
+
+
+def __getattr__(name):
+    """ Creates the enabled view classes, and looks up the ObjC classes, when
+    they are first used, to keep importing anchor fast. """
+    if name in OBJC_CLASSES:
+        value = objc_class(name)
+    elif name == '__all__':
+        value = [
+            key for key in dict.fromkeys(
+                list(globals()) + list(OBJC_CLASSES) + _view_class_names())
+            if not key.startswith('_')]
+    else:
+        value = enabled_class(name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(
+        list(globals()) + list(OBJC_CLASSES) + _view_class_names()))
 
 
 def enable(*views):
     """ All views must be enabled before constraints can be applied. It is safe
-    to enable an already-enabled view.
+    to enable an already-enabled view, which is left as it is.
 
     You can provide several views to be enabled. First view is returned."""
     for view in views:
-        assert hasattr(view, 'objc_instance')
-        view.at = At(view)
-        view.dock = Dock(view)
-        view.align = Align(view)
+        if getattr(view, 'at', None) is None:
+            assert hasattr(view, 'objc_instance')
+            view.at = At(view)
+            view.dock = Dock(view)
+            view.align = Align(view)
     return views[0]
 
 
+@on_main_thread
+@batched
 def fit(*views):
     """ Convenience method to both enable and apply natural fit width and
     height constraints with one call. Useful mainly for Buttons and Labels.
 
-    You can provide several views, first view is returned. """
-    for view in views:
-        enable(view)
-        view.dock.fit()
+    You can provide several views, first view is returned. All the views
+    are measured and constrained with a single trip to the main thread, and
+    labels and buttons with the same text and font are measured only once.
+    """
+    enable(*views)
+    for view, (width, height) in zip(views, _fit_sizes(views)):
+        view.at.width == width
+        view.at.height == height
     return views[0]
 
 
-@objc_util.on_main_thread
+SPEC_DEFAULTS = (None, None, 0, None, None, 1, 0, 1000)
+
+
+def constrain_many(views, specs):
+    """ Creates constraints from data instead of `at` expressions. Useful
+    when generating large layouts, e.g. dashboards with thousands of cells.
+
+    Each spec is a tuple:
+
+        (view index, attribute, relation, other index, other attribute,
+         multiplier, constant, priority)
+
+    Indexes refer to the `views` sequence. Attributes are given as names,
+    e.g. 'top', or as NSLayoutConstraint attribute codes. Relation is -1, 0
+    or 1 for `<=`, `==` and `>=`. Other index and attribute are None when
+    comparing with a constant. Trailing values can be left out, and default
+    to no other view, multiplier 1, constant 0 and priority 1000.
+
+    All specs are checked before anything is created, and a TypeError lists
+    every invalid spec. The constraints are activated together, or added to
+    the current `batch`. Returns the `Constraint` records in spec order. """
+    specs = [tuple(spec) + SPEC_DEFAULTS[len(spec):] for spec in specs]
+    if not specs:
+        return []
+    (indexes, attributes, relations, other_indexes, other_attributes,
+     multipliers, constants, priorities) = zip(*specs)
+
+    by_index = dict(enumerate(views))
+    targets = list(map(by_index.get, indexes))
+    others = list(map(by_index.get, other_indexes))
+    codes = list(map(ATTRIBUTE_CODES.get, attributes))
+    other_codes = [
+        ATTRIBUTE_CODES.get(other_attribute) if other_index is not None
+        else 0 if other_attribute is None
+        else None
+        for other_index, other_attribute in zip(
+            other_indexes, other_attributes)]
+
+    valid = map(VALID_SPECS.__contains__, zip(codes, other_codes, relations))
+    invalid = [
+        row for row, (ok, target, other, other_index) in enumerate(
+            zip(valid, targets, others, other_indexes))
+        if not ok or target is None or (
+            other is None and other_index is not None)]
+    invalid.extend(
+        row for row, (target, code, other, other_code) in enumerate(
+            zip(targets, codes, others, other_codes))
+        if type(target) is Guide and code not in GUIDE_ATTRIBUTES
+        or type(other) is Guide and other_code not in GUIDE_ATTRIBUTES)
+    invalid.extend(
+        row for row, priority in enumerate(priorities)
+        if type(priority) is not int or priority < 0 or priority > 1000)
+    if invalid:
+        raise TypeError(
+            f'{len(set(invalid))} invalid constraint specs:\n' +
+            '\n'.join(
+                f'  {row}: {specs[row]}' for row in sorted(set(invalid))))
+
+    constraints = list(map(
+        Constraint._from_spec, targets, codes, relations, others,
+        other_codes, multipliers, constants, priorities))
+    pending = batch.pending()
+    if pending is not None:
+        pending.extend(constraints)
+    else:
+        backend.activate(constraints)
+    return constraints
+
+
+class template:
+    """
+    Constraint recipe over named roles, recorded once and then applied to
+    any number of views:
+
+        @anchor.template
+        def card_layout(card, title, content, share=.9):
+            title.dock.bottom_trailing()
+            content.at.center_x == card.at.center_x
+            content.at.center_y == card.at.center_y * 1.25
+            content.at.width == card.at.width * share
+
+        card_layout.apply(
+            [(card, card['title'], card['content']) for card in cards],
+            share=.3)
+
+    The positional parameters of the function are the roles. The function
+    is called once per set of keyword parameters, with stand-ins for the
+    views, and the constraints it creates are recorded, with their
+    compatibility already checked. `apply` then creates the recorded
+    constraints for every tuple of views, and activates them all with a
+    single call, or adds them to the current `batch`.
+
+    Anything can be used within the function that only creates
+    constraints, including `dock` and `align` methods and the superviews,
+    safe areas and margins of the roles. Measuring views, e.g. with `fit`,
+    or creating guides is not possible. Calling the template runs the
+    function directly with the given views.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        code = func.__code__
+        self.roles = code.co_varnames[
+            :code.co_argcount - len(func.__defaults__ or ())]
+        self._recipes = {}
+        wraps(func)(self)
+
+    @transaction
+    def __call__(self, *views, **params):
+        """Calls the function with real views, as if it was not a template,
+        within a `batch`."""
+        enable(*views)
+        return self.func(*views, **params)
+
+    def recipe(self, **params):
+        """Returns the recorded constraints as (view, attribute, relation,
+        other view, other attribute, multiplier, constant, priority)
+        tuples, where the views are paths from a role, e.g.
+        `(0, 'superview', 'safe_area')`."""
+        key = tuple(sorted(params.items()))
+        recipe = self._recipes.get(key)
+        if recipe is None:
+            recorded = []
+            previous = batch._replace(recorded)
+            try:
+                self.func(*(
+                    Role((index,), name)
+                    for index, name in enumerate(self.roles)), **params)
+            finally:
+                batch._replace(previous)
+            recipe = self._recipes[key] = [
+                (Role.path_of(constraint.view), constraint.attribute,
+                 constraint.operator, Role.path_of(constraint.other_view),
+                 constraint.other_attribute, constraint.multiplier,
+                 constraint._constant, constraint._priority)
+                for constraint in recorded]
+        return recipe
+
+    @transaction
+    def apply(self, view_tuples, **params):
+        """Creates the constraints of the template for each tuple of views,
+        given in the order of the roles. Returns the `Constraint` records."""
+        recipe = self.recipe(**params)
+        from_spec = Constraint._from_spec
+        resolve = Role.resolve
+        constraints = []
+        for views in view_tuples:
+            if len(views) != len(self.roles):
+                raise TypeError(
+                    f'{self.__name__} needs {len(self.roles)} views, one '
+                    f'for each of {self.roles}, got {len(views)}')
+            if views:
+                enable(*views)
+            items = {(index,): view for index, view in enumerate(views)}
+            for (path, attribute, operator, other_path, other_attribute,
+                    multiplier, constant, priority) in recipe:
+                constraints.append(from_spec(
+                    resolve(path, items), attribute, operator,
+                    resolve(other_path, items), other_attribute,
+                    multiplier, constant, priority))
+        batch.pending().extend(constraints)
+        return constraints
+
+
+class Role:
+    """
+    Stands in for a view while a `template` is recorded. `path` tells how
+    the view is found from the views the template is applied to.
+    """
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.at = At(self)
+        self.dock = Dock(self)
+        self.align = Align(self)
+        self._superview = None
+
+    @property
+    def superview(self):
+        if self._superview is None:
+            self._superview = Role(
+                self.path + ('superview',), self.name + '.superview')
+        return self._superview
+
+    # The safe area and margins are recorded as paths, not looked up
+
+    @property
+    def objc_instance(self):
+        return self
+
+    def safeAreaLayoutGuide(self):
+        return None
+
+    def layoutMarginsGuide(self):
+        return None
+
+    @staticmethod
+    def path_of(item):
+        if item is None:
+            return None
+        if isinstance(item, Role):
+            return item.path
+        guide_type = getattr(item, 'guide_type', None)
+        if guide_type in ('safe_area', 'margins') and \
+                isinstance(item.superview, Role):
+            return item.superview.path + (guide_type,)
+        raise TypeError(
+            f'Templates can only constrain their roles, not {item}')
+
+    @staticmethod
+    def resolve(path, items):
+        """Returns the view for the path, and remembers it in `items`."""
+        view = items.get(path)
+        if view is None and path is not None:
+            parent = Role.resolve(path[:-1], items)
+            step = path[-1]
+            if step == 'superview':
+                view = parent.superview
+            else:
+                view = getattr(_at(parent), step).view
+            items[path] = view
+        return view
+
+
+class ConstraintRegistry:
+    """
+    Index of the constraints created by anchor that involve a view, kept in
+    the view as `anchor_constraints`. `first` and `second` map attribute
+    codes to the constraints where the view is the first or the second item.
+    `first` maps each constraint to its NSLayoutConstraint, `second` holds
+    weak references to the constraints, as the NSLayoutConstraint is in the
+    registry of the first item.
+
+    The registry keeps the ObjC objects alive, so that `Constraint` objects
+    only need to hold weak references to them. As the registry lives in the
+    view, it goes away with the view. `second` is weak so that the registry
+    of a superview does not keep removed subviews alive through the
+    constraints between them.
+    """
+
+    __slots__ = ('first', 'second', '_release')
+
+    def __init__(self):
+        self.first = {}
+        self.second = {}
+        self._release = self._discard_ref
+
+    def add(self, constraint, objc_constraint, second=False):
+        if second:
+            self.second.setdefault(constraint.other_attribute, {})[
+                weakref.ref(constraint, self._release)] = None
+        else:
+            self.first.setdefault(
+                constraint.attribute, {})[constraint] = objc_constraint
+
+    def discard(self, constraint, second=False):
+        index, attribute, key = (
+            (self.second, constraint.other_attribute, weakref.ref(constraint))
+            if second
+            else (self.first, constraint.attribute, constraint))
+        constraints = index.get(attribute)
+        if constraints is not None:
+            constraints.pop(key, None)
+            if not constraints:
+                del index[attribute]
+
+    def _discard_ref(self, ref):
+        for attribute, constraints in list(self.second.items()):
+            if constraints.pop(ref, 0) is None and not constraints:
+                del self.second[attribute]
+
+    def get(self, constraint):
+        """Returns the NSLayoutConstraint of a constraint where the view is
+        the first item, or None."""
+        return self.first.get(constraint.attribute, {}).get(constraint)
+
+    def constraints(self, first=True, second=False, attributes=None):
+        """Returns a dict of the matching constraints and their
+        NSLayoutConstraints. `attributes` is a collection of attribute codes,
+        or None for all."""
+        found = {}
+        if first:
+            if attributes is None:
+                for constraints in self.first.values():
+                    found.update(constraints)
+            else:
+                for attribute in attributes:
+                    found.update(self.first.get(attribute, ()))
+        if second:
+            if attributes is None:
+                seconds = list(self.second.values())
+            else:
+                seconds = [
+                    self.second[attribute] for attribute in attributes
+                    if attribute in self.second]
+            for constraints in seconds:
+                for ref in list(constraints):
+                    constraint = ref()
+                    if constraint is not None:
+                        found[constraint] = constraint_registry(
+                            constraint.view).get(constraint)
+        return found
+
+
+def constraint_registry(view):
+    """ Returns the `ConstraintRegistry` of the constraints created by anchor
+    for the view. """
+    try:
+        return view.anchor_constraints
+    except AttributeError:
+        view.anchor_constraints = ConstraintRegistry()
+        return view.anchor_constraints
+
+
+@profiled('find_constraint')
+@on_main_thread
 def find_constraint(view, description):
     objc_view = view.objc_instance
     while view:
@@ -731,43 +1970,86 @@ def find_constraint(view, description):
         view = view.superview
 
 
-@objc_util.on_main_thread
+@profiled('find_constraints')
 def find_constraints(view, first=True, second=False, active_only=True,
         filter=None):
-    objc_view = view.objc_instance
-    constraints = []
+    """ Returns the NSLayoutConstraints created by anchor where the view is
+    the first item, or with `second=True`, the second item. `filter` can
+    be an attribute or a list of attributes, e.g. `At.top`, to only include
+    constraints on those attributes of the view.
+
+    Constraints are found in the index kept by anchor, without searching the
+    view hierarchy. With `active_only` (the default), constraints that are no
+    longer active, e.g. because the other view was removed from the
+    hierarchy, are left out. """
+    constraints = _find_constraints(view, first, second, filter)
+    if active_only:
+        return _active(list(constraints.values()))
+    return list(constraints.values())
+
+
+def _find_constraints(view, first=True, second=False, filter=None):
+    """Returns the matching `Constraint` objects of the view and their
+    NSLayoutConstraints as a dict."""
+    registry = getattr(view, 'anchor_constraints', None)
+    if registry is None:
+        return {}
     if filter is None:
-        filter = []
-    elif type(filter) not in (tuple, list):
-        filter = [filter]
-    filter = [inspect.getclosurevars(filter_prop.fget).nonlocals['attribute']
-              for filter_prop in filter]
-    while view:
-        for c in view.objc_instance.constraints():
-            if (
-                    (first and c.firstItem() == objc_view) or
-                    (second and c.secondItem() == objc_view)
-            ) and (
-                    c.active() or not active_only
-            ) and (
-                    len(filter) == 0 or c.firstAttribute() in filter
-            ):
-                constraints.append(c)
-        view = view.superview
-    return constraints
+        codes = None
+    elif type(filter) in (tuple, list):
+        codes = [filter_attribute.code for filter_attribute in filter]
+    else:
+        codes = [filter.code]
+    return registry.constraints(first, second, codes)
+
+
+@on_main_thread
+def _active(objc_constraints):
+    return [
+        objc_constraint for objc_constraint in objc_constraints
+        if objc_constraint.active()]
+
+
+def remove_constraints(views, filter=None, second=False):
+    """ Deactivates and forgets the constraints created by anchor where the
+    view is the first item, or with `second=True`, also the ones where it is
+    the second item. `views` can be a single view or a list of views, and
+    `filter` an attribute or a list of attributes, as with
+    `find_constraints`.
+
+    All the constraints are deactivated together, with a single call.
+    Returns the removed `Constraint` objects. """
+    if type(views) not in (tuple, list):
+        views = [views]
+    constraints = {}
+    for view in views:
+        constraints.update(
+            _find_constraints(view, True, second, filter))
+    if constraints:
+        backend.deactivate(list(constraints.values()))
+    _forget(constraints)
+    if group._groups:
+        group._prune()
+    return list(constraints)
 
 
-def remove_constraints(view, filter=None):
-    if hasattr(view, 'layout_constraints'):
-        for constraint in view.layout_constraints.copy():
-            if filter is not None and constraint.attribute_name not in filter:
-                print('skipping', constraint.attribute_name)
-                continue
-            remove_constraint(constraint)
-        # remove_constraint(view.layout_constraints)
+def _unregister(constraint):
+    constraint_registry(constraint.view).discard(constraint)
+    if constraint.other_view is not None:
+        constraint_registry(constraint.other_view).discard(
+            constraint, second=True)
+
+
+def _forget(constraints):
+    """Unregisters deactivated constraints and detaches the records from
+    their NSLayoutConstraints."""
+    for constraint in constraints:
+        _unregister(constraint)
+        constraint._objc_ref = None
+        constraint._description = None
 
 
-@objc_util.on_main_thread
+@on_main_thread
 def remove_guides(view):
     ''' Removes all layout guides from a view. '''
     vo = view.objc_instance
@@ -777,7 +2059,7 @@ def remove_guides(view):
             vo.removeLayoutGuide_(guide)
 
 
-@objc_util.on_main_thread
+@on_main_thread
 def remove_guide(guide):
     ''' Remove the given guide from its owner. '''
     vo = guide.view.objc_instance
@@ -808,9 +2090,11 @@ def check_ambiguity(view, indent=0):
 
 class Guide(SimpleNamespace):
 
-    @objc_util.on_main_thread
+    guide_type = 'layout'
+
+    @on_main_thread
     def __init__(self, view):
-        guide = UILayoutGuide.new().autorelease()
+        guide = objc_class('UILayoutGuide').new().autorelease()
         view.objc_instance.addLayoutGuide_(guide)
         super().__init__(
             objc_instance=guide,
@@ -830,6 +2114,65 @@ class Guide(SimpleNamespace):
 
 
 class Dimensions:
+    """
+    Screen size, device idiom and size classes of the app. Reading the device
+    idiom and size classes goes over the bridge, so they are cached, and read
+    again only when the screen size changes, or when `refresh` is called.
+
+    Functions subscribed with `subscribe` are called without arguments when
+    any of the values change, for example on rotation:
+
+        @Dimensions.subscribe
+        def rotated():
+            ...
+
+    The change is noticed on the next call of any of the methods, e.g. in
+    the `layout` method of your root view. Call `refresh` if the traits can
+    change while the screen size does not (e.g. iPad multitasking).
+    """
+
+    _screen_size = None
+    _idiom = None
+    _vertical_size_class = None
+    _subscribers = []
+
+    @classmethod
+    def screen_size(cls):
+        "Returns the screen size as a (width, height) tuple."
+        screen_size = tuple(ui.get_screen_size())
+        if screen_size != cls._screen_size:
+            cls.refresh(screen_size)
+        return screen_size
+
+    @classmethod
+    def refresh(cls, screen_size=None):
+        """Reads the screen size and the traits of the key window, and calls
+        the subscribers if they have changed."""
+        if screen_size is None:
+            screen_size = tuple(ui.get_screen_size())
+        traits = objc_class('UIApplication').sharedApplication().\
+            keyWindow().traitCollection()
+        values = (
+            screen_size,
+            traits.userInterfaceIdiom(),
+            traits.verticalSizeClass())
+        previous = (cls._screen_size, cls._idiom, cls._vertical_size_class)
+        if values == previous:
+            return
+        cls._screen_size, cls._idiom, cls._vertical_size_class = values
+        for subscriber in list(cls._subscribers):
+            subscriber()
+
+    @classmethod
+    def subscribe(cls, subscriber):
+        """Calls the subscriber whenever the dimensions change. Returns the
+        subscriber, so this can be used as a decorator."""
+        cls._subscribers.append(subscriber)
+        return subscriber
+
+    @classmethod
+    def unsubscribe(cls, subscriber):
+        cls._subscribers.remove(subscriber)
 
     @classmethod
     def horizontal_size_class(cls):
@@ -845,33 +2188,32 @@ class Dimensions:
 
     @classmethod
     def vertical_size_class(cls):
-        return ['constrained', 'regular'][UIApplication.sharedApplication().\
-                                              keyWindow().traitCollection().\
-                                              verticalSizeClass() - 1]
+        cls.screen_size()
+        return ['constrained', 'regular'][cls._vertical_size_class - 1]
 
     @classmethod
     def is_portrait(cls):
         "Returns true if the device thinks it is in portrait orientation."
-        w, h = ui.get_screen_size()
+        w, h = cls.screen_size()
         return w < h
 
     @classmethod
     def is_landscape(cls):
         "Returns true if the device thinks it is in landscape orientation."
-        w, h = ui.get_screen_size()
+        w, h = cls.screen_size()
         return w > h
 
     @classmethod
     def is_phone(cls):
         "Returns true if the device is a phone-type device."
-        return objc_util.UIApplication.sharedApplication().keyWindow().\
-                   traitCollection().userInterfaceIdiom() == 0
+        cls.screen_size()
+        return cls._idiom == 0
 
     @classmethod
     def is_pad(cls):
         "Returns true if the device is a pad-type device."
-        return UIApplication.sharedApplication().keyWindow().\
-                   traitCollection().userInterfaceIdiom() == 1
+        cls.screen_size()
+        return cls._idiom == 1
 
     @classmethod
     def is_width_constrained(cls):
@@ -900,6 +2242,9 @@ class Dimensions:
         return cls.vertical_size_class() == 'regular'
 
 
+Dimensions.subscribe(group.update)
+
+
 def add_subviews(view):
     """
     Convenience method to add all members of a view that are views as its
@@ -911,6 +2256,37 @@ def add_subviews(view):
             view.add_subview(value)
 
 
+@lru_cache(maxsize=1024)
+def grid_dimensions(count, width, height, gap=0, border_width=0):
+    """Returns the (count_x, count_y) grid for `count` cells in an area of
+    the given size, with the largest possible cells, accounting for gaps
+    between and around the cells and the border. Of equally large options,
+    the one with the fewest empty slots is chosen.
+
+    With `a` and `b` being the width and height available for cells and one
+    gap each, cells are `min(a / count_x, b / count_y) - gap` in size. The
+    best grid is next to the continuous optimum `count_x = sqrt(count * a /
+    b)`: with fewer columns the grid is always limited by its height, with
+    fewer rows by its width, so only the nearest integers on both sides
+    need to be checked. With no cells, the grid is (0, 0)."""
+    if count <= 0:
+        return 0, 0
+    a = width - 2 * border_width - gap
+    b = height - 2 * border_width - gap
+    if a <= 0 or b <= 0:
+        return (count, 1) if a > b else (1, count)
+    best_x = math.sqrt(count * a / b)
+    best_y = count / best_x
+    candidates = []
+    for estimate in (best_x, best_y):
+        for n in range(math.floor(estimate) - 1, math.ceil(estimate) + 2):
+            n = min(max(n, 1), count)
+            m = math.ceil(count / n)
+            candidates.append((n, m) if estimate is best_x else (m, n))
+    return max(candidates, key=lambda c: (
+        min(a / c[0], b / c[1]), -(c[0] * c[1]), -c[0]))
+
+
 class GridView(ui.View):
     'Places subviews as squares that fill the available space.'
 
@@ -962,38 +2338,72 @@ class GridView(ui.View):
 
         self.gap = gap
 
+        self._frame_cache = {}
+        self._assigned_frames = []
+
         enable(self)
 
+    def add_subview(self, subview):
+        super().add_subview(subview)
+        set_needs_layout(self)
+
+    def remove_subview(self, subview):
+        super().remove_subview(subview)
+        set_needs_layout(self)
+
     def dimensions(self, count):
-        if self.height == 0:
-            return 1, count
-        ratio = self.width / self.height
-        count_x = math.sqrt(count * self.width / self.height)
-        count_y = math.sqrt(count * self.height / self.width)
-        operations = (
-            (math.floor, math.floor),
-            (math.floor, math.ceil),
-            (math.ceil, math.floor),
-            (math.ceil, math.ceil)
-        )
-        best = None
-        best_x = None
-        best_y = None
-        for oper in operations:
-            cand_x = oper[0](count_x)
-            cand_y = oper[1](count_y)
-            diff = cand_x * cand_y - count
-            if diff >= 0:
-                if best is None or diff < best:
-                    best = diff
-                    best_x = cand_x
-                    best_y = cand_y
-        return (best_x, best_y)
+        return grid_dimensions(
+            count, self.width, self.height, self.gap, self.border_width)
+
+    # Number of layouts remembered, e.g. for both orientations
+    cache_size = 16
 
+    @profiled('GridView.layout')
     def layout(self):
-        count = len(self.subviews)
+        subviews = self.subviews
+        count = len(subviews)
         if count == 0: return
 
+        key = (self.width, self.height, self.border_width, count,
+               self.count_x, self.count_y, self.pack_x, self.pack_y, self.gap)
+        frames = self._frame_cache.get(key)
+        if frames is None:
+            frames = self.frames(count)
+            if len(self._frame_cache) >= self.cache_size:
+                del self._frame_cache[next(iter(self._frame_cache))]
+            self._frame_cache[key] = frames
+
+        previous = self._assigned_frames
+        assigned = []
+        for i, (view, frame) in enumerate(zip(subviews, frames)):
+            if i >= len(previous) or previous[i][0] is not view or \
+                    previous[i][1] != frame:
+                view.frame = frame
+            assigned.append((view, frame))
+        self._assigned_frames = assigned
+
+    def invalidate_layout(self):
+        """Forgets the cached frames, so that the next layout recalculates
+        them and sets the frames of all subviews. Needed only if the frames
+        of the subviews have been changed outside of the grid."""
+        self._frame_cache.clear()
+        self._assigned_frames = []
+
+    def frames(self, count):
+        """Returns the frames for `count` subviews, in subview order, as
+        tuples of (x, y, width, height)."""
+        count_x, _, x, y, width, height, step_x, step_y = \
+            self.geometry(count)
+        return [
+            (x + (i % count_x) * step_x, y + (i // count_x) * step_y,
+             width, height)
+            for i in range(count)]
+
+    def geometry(self, count):
+        """Returns the grid for `count` cells as a tuple of (count_x,
+        count_y, x, y, width, height, step_x, step_y), where (x, y) is the
+        position of the first cell, and each following column and row is
+        `step_x` and `step_y` further."""
         count_x, count_y = self.count_x, self.count_y
         if count_x is None and count_y is None:
             count_x, count_y = self.dimensions(count)
@@ -1020,6 +2430,7 @@ class GridView(ui.View):
         free_count_x = exp_pack_x.count('_')
         free_count_y = exp_pack_y.count('_')
 
+        per_free_x = per_free_y = 0
         if free_count_x > 0:
             per_free_x = (self.width - borders - count_x * dim -
                 (count_x + 1 - free_count_x) * self.gap) / free_count_x
@@ -1030,20 +2441,139 @@ class GridView(ui.View):
         real_dim_x = dim_x if free_count_x == 0 else dim
         real_dim_y = dim_y if free_count_y == 0 else dim
 
-        subviews = iter(self.subviews)
-        y = self.border_width + (per_free_y if self.top_free else self.gap)
-        for row in range(count_y):
-            x = self.border_width + (
-                per_free_x if self.leading_free else self.gap)
-            for col in range(count_x):
-                try:
-                    view = next(subviews)
-                except StopIteration:
-                    break
-                view.frame = (x, y, real_dim_x, real_dim_y)
-                x += real_dim_x + (
-                    per_free_x if self.center_x_free else self.gap)
-            y += real_dim_y + (per_free_y if self.center_y_free else self.gap)
+        return (
+            count_x, count_y,
+            self.border_width + (per_free_x if px[0] == '_' else self.gap),
+            self.border_width + (per_free_y if py[0] == '_' else self.gap),
+            real_dim_x, real_dim_y,
+            real_dim_x + (per_free_x if px[1] == '_' else self.gap),
+            real_dim_y + (per_free_y if py[1] == '_' else self.gap))
+
+
+class DataGridView(GridView):
+    """GridView for large numbers of cells, which creates views only for
+    the cells that are visible, and reuses them as the visible part
+    changes. The grid is typically placed in a ScrollView, sized to hold
+    all the cells, with the grid as the delegate of the ScrollView.
+
+    Cells are provided by a data source object with two methods:
+
+      * `gridview_number_of_cells(gridview)` - returns the number of cells
+      * `gridview_cell_for_index(gridview, index, cell)` - returns the view
+        for the cell at `index`. `cell` is a view no longer visible that
+        can be reused, or None if a new view is needed.
+
+    The packing and count options are the same as for GridView."""
+
+    # Cells are added and removed by layout itself
+    add_subview = ui.View.add_subview
+    remove_subview = ui.View.remove_subview
+
+    def __init__(self, data_source=None, **kwargs):
+        super().__init__(**kwargs)
+        self.data_source = data_source
+        self._visible = {}
+        self._reuse_pool = []
+
+    @property
+    def visible_cells(self):
+        """Dict of the views of the visible cells, keyed by cell index."""
+        return {index: cell for index, (cell, _) in self._visible.items()}
+
+    def reload_data(self):
+        """Returns all cells to the reuse pool, so that the data source is
+        asked for every visible cell again on the next layout."""
+        for cell, frame in self._visible.values():
+            cell.hidden = True
+            self._reuse_pool.append(cell)
+        self._visible = {}
+        set_needs_layout(self)
+
+    def visible_bounds(self):
+        """Returns the part of the grid that is visible as (x, y, width,
+        height). If the grid is in a ScrollView, this is the part that is
+        scrolled into view, otherwise all of it."""
+        superview = self.superview
+        if superview is None or not hasattr(superview, 'content_offset'):
+            return 0, 0, self.width, self.height
+        offset_x, offset_y = superview.content_offset
+        left = max(offset_x - self.x, 0)
+        top = max(offset_y - self.y, 0)
+        right = min(offset_x - self.x + superview.width, self.width)
+        bottom = min(offset_y - self.y + superview.height, self.height)
+        return left, top, max(right - left, 0), max(bottom - top, 0)
+
+    def visible_indexes(self, geometry, count):
+        """Returns the indexes of the cells that intersect the visible
+        bounds."""
+        count_x, count_y, x, y, width, height, step_x, step_y = geometry
+        if width <= 0 or height <= 0:
+            return range(0)
+        left, top, visible_width, visible_height = self.visible_bounds()
+        first_col, last_col = self._visible_span(
+            x, width, step_x, left, left + visible_width, count_x)
+        first_row, last_row = self._visible_span(
+            y, height, step_y, top, top + visible_height, count_y)
+        return [
+            index
+            for row in range(first_row, last_row)
+            for index in range(
+                row * count_x + first_col,
+                min(row * count_x + last_col, count))]
+
+    @staticmethod
+    def _visible_span(start, size, step, low, high, count):
+        if step <= 0:
+            return 0, count
+        first = max(math.floor((low - start - size) / step) + 1, 0)
+        last = min(math.ceil((high - start) / step), count)
+        return first, max(first, last)
+
+    @profiled('GridView.layout')
+    def layout(self):
+        count = self.data_source.gridview_number_of_cells(self) \
+            if self.data_source else 0
+        if count == 0:
+            geometry, indexes = None, ()
+        else:
+            geometry = self.geometry(count)
+            indexes = self.visible_indexes(geometry, count)
+
+        previous = self._visible
+        visible = {}
+        for index in indexes:
+            if index in previous:
+                visible[index] = previous.pop(index)
+        for cell, frame in previous.values():
+            cell.hidden = True
+            self._reuse_pool.append(cell)
+
+        if geometry:
+            count_x, _, x, y, width, height, step_x, step_y = geometry
+        for index in indexes:
+            frame = (
+                x + (index % count_x) * step_x,
+                y + (index // count_x) * step_y,
+                width, height)
+            cell, assigned_frame = visible.get(index, (None, None))
+            if cell is None:
+                cell = self._reuse_pool.pop() if self._reuse_pool else None
+                new_cell = self.data_source.gridview_cell_for_index(
+                    self, index, cell)
+                if cell is not None and new_cell is not cell:
+                    self._reuse_pool.append(cell)
+                cell = new_cell
+                if cell.superview is not self:
+                    self.add_subview(cell)
+                cell.hidden = False
+            elif assigned_frame == frame:
+                continue
+            cell.frame = frame
+            visible[index] = (cell, frame)
+        self._visible = visible
+
+    def scrollview_did_scroll(self, scrollview):
+        self.layout()
 
 
 class DiagnosticOverlay(ui.View):
@@ -1101,9 +2631,9 @@ class DiagnosticOverlay(ui.View):
     def collect_views(self, view):
         if type(view) is SimpleNamespace:
             return []
-        local_list = [view] if hasattr(view, 'layout_constraints') else []
+        local_list = [view] if hasattr(view, 'anchor_constraints') else []
         for subview in view.subviews:
-            if hasattr(subview, 'layout_constraints'):
+            if hasattr(subview, 'anchor_constraints'):
                 local_list += self.collect_views(subview)
         return local_list
 
@@ -1115,7 +2645,7 @@ class DiagnosticOverlay(ui.View):
         matching target attribute. """
         process_queue = self.collect_views(first_view)
         for view in process_queue:
-            for constraint in view.layout_constraints:
+            for constraint in view.anchor_constraints.constraints():
                 if (len(attributes) > 0 and constraint.attribute_name not in
                         attributes):
                     continue
@@ -1149,98 +2679,27 @@ class DiagnosticOverlay(ui.View):
         if view is None: return
         thickness = 5
         share = 0.75
-        marker_size = 20
-        if a == 'left':
-            marker.at.center_x == view.at.left
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == marker_size
-        elif a == 'right':
-            marker.at.center_x == view.at.right
-            marker.at.center_y == view.at.center_y
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
-        elif a == 'top':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.top
-            marker.at.height == thickness
-            marker.at.width == view.at.width * share
-        elif a == 'bottom':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.bottom
-            marker.at.height == thickness
-            marker.at.width == view.at.width * share
-        elif a == 'leading':
-            marker.at.center_x == view.at.leading
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
-        elif a == 'trailing':
-            marker.at.center_x == view.at.trailing
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
-        elif a == 'width':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.center_y
-            marker.at.height == thickness
-            marker.at.width == view.at.width
-        elif a == 'height':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height
-        elif a == 'center_x':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
-        elif a == 'center_y':
+        attribute = getattr(At, a)
+        size, direction = attribute.type_str[:2]
+        if size == 'S':
             marker.at.center_x == view.at.center_x
             marker.at.center_y == view.at.center_y
-            marker.at.height == thickness
-            marker.at.width == view.at.width * share
-        elif a == 'last_baseline':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.last_baseline
-            marker.at.height == thickness
-            marker.at.width == view.at.width * share
-        elif a == 'first_baseline':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.first_baseline
-            marker.at.height == thickness
-            marker.at.width == view.at.width * share
-        elif a == 'left_margin':
-            marker.at.center_x == view.at.left_margin
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
-        elif a == 'right_margin':
-            marker.at.center_x == view.at.right_margin
+            if a == 'width':
+                marker.at.height == thickness
+                marker.at.width == view.at.width
+            else:
+                marker.at.width == thickness
+                marker.at.height == view.at.height
+        elif direction == 'H':
+            marker.at.center_x == getattr(view.at, a)
             marker.at.center_y == view.at.center_y
             marker.at.width == thickness
             marker.at.height == view.at.height * share
-        elif a == 'top_margin':
-            marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.top_margin
-            marker.at.height == thickness
-            marker.at.width == view.at.width * share
-        elif a == 'bottom_margin':
+        else:
             marker.at.center_x == view.at.center_x
-            marker.at.center_y == view.at.bottom_margin
+            marker.at.center_y == getattr(view.at, a)
             marker.at.height == thickness
             marker.at.width == view.at.width * share
-        elif a == 'leading_margin':
-            marker.at.center_x == view.at.leading_margin
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
-        elif a == 'trailing_margin':
-            marker.at.center_x == view.at.trailing_margin
-            marker.at.center_y == view.at.center_y
-            marker.at.width == thickness
-            marker.at.height == view.at.height * share
 
 
 class NameSpace(dict):
@@ -1317,20 +2776,18 @@ def create_view_hierarchy(
 
 if __name__ == '__main__':
 
+    View, Label, TextField, Button = map(
+        enabled_class, ('View', 'Label', 'TextField', 'Button'))
+
     class LayoutDemo(ui.View):
 
         def __init__(self, **kwargs):
             super().__init__(**kwargs)
-            self.previous_size_class = None
-            self.active_constraints = []
             enable(self)
             self.create_ui()
 
         def layout(self):
-            if Dimensions.is_width_constrained():
-                self.main_leading.constant = 0
-            else:
-                self.main_leading.constant = 300
+            group.update()
 
         def style(self, view):
             view.background_color = 'white'
@@ -1352,17 +2809,20 @@ if __name__ == '__main__':
             self.style(side_panel)
             self.add_subview(side_panel)
 
-            main_frame.dock.all(fit=Dock.SAFE)
+            main_frame.dock.vertical(fit=Dock.SAFE)
+            main_frame.at.trailing == self.at.safe_area.trailing
 
-            self.main_leading = main_frame.at.leading == \
-                                self.at.safe_area.leading
-
-            side_panel.dock.leading(fit=Dock.SAFE)
             side_panel.at.width == 300
+            side_panel.align.top(main_frame)
             side_panel.align.height(main_frame)
-
             side_panel.at.trailing == main_frame.at.leading
 
+            # Side panel is shown only when there is room for it
+            with group('regular'):
+                side_panel.at.leading == self.at.safe_area.leading
+            with group('constrained'):
+                main_frame.at.leading == self.at.safe_area.leading
+
             search_field = TextField(
                 name='Searchfield',
                 placeholder='Search path')
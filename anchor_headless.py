@@ -0,0 +1,629 @@
+# coding: utf-8
+
+"""
+Headless stand-ins for Pythonista's `objc_util` and `ui` modules, so that
+anchor layouts can be built, computed and profiled on any Python.
+
+anchor uses these automatically when the real modules cannot be imported.
+To use them explicitly, call `install()` before importing anchor or ui.
+
+The stand-ins record every call that would cross the ObjC bridge in
+`calls`, the ones made outside the main thread also in `off_main_thread`,
+and every main-thread hop in `dispatches`. `layout(root)`, also
+run by `present()`, computes the frames of constrained views with the
+solver in `anchor_solver`. Functions given to `ui.delay` run on the next
+`run_delayed()` or `layout(root)`.
+"""
+
+import sys
+import types
+import itertools
+import concurrent.futures
+from types import SimpleNamespace
+from collections import Counter
+from functools import wraps
+
+calls = Counter()
+off_main_thread = Counter()
+dispatches = 0
+_main_thread_depth = 0
+_ids = itertools.count(0x10000, 0x10)
+
+
+def reset_counters():
+    global dispatches
+    calls.clear()
+    off_main_thread.clear()
+    dispatches = 0
+
+
+def bridged(cls):
+    """Class decorator that counts calls to public methods as bridge calls."""
+    for name, value in list(vars(cls).items()):
+        if name.startswith('__'):
+            continue
+        if isinstance(value, classmethod):
+            setattr(cls, name, classmethod(_counting(name, value.__func__)))
+        elif callable(value):
+            setattr(cls, name, _counting(name, value))
+    return cls
+
+
+def _counting(name, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        calls[name] += 1
+        if _main_thread_depth == 0:
+            off_main_thread[name] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def on_main_thread(func):
+    """Only the outermost call is counted, nested calls are already on the
+    main thread."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        global dispatches, _main_thread_depth
+        if _main_thread_depth == 0:
+            dispatches += 1
+        _main_thread_depth += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _main_thread_depth -= 1
+    return wrapper
+
+
+class MainThreadExecutor(concurrent.futures.Executor):
+    """Executor for `anchor.main_thread_executor` that runs the functions
+    right away in the calling thread, so that asynchronous layouts run
+    deterministically."""
+
+    def submit(self, func, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+        return future
+
+
+class Size(types.SimpleNamespace):
+    pass
+
+
+@bridged
+class ObjCView:
+
+    def __init__(self, view):
+        self.view = view
+        self.address = next(_ids)
+        self._constraints = []
+        self._guides = []
+        self._translates = True
+        self._safe_area = None
+        self._margins = None
+
+    def constraints(self):
+        return list(self._constraints)
+
+    def addConstraint_(self, constraint):
+        self._constraints.append(constraint)
+
+    def removeConstraint_(self, constraint):
+        self._constraints.remove(constraint)
+
+    def superview(self):
+        superview = self.view.superview
+        return superview.objc_instance if superview is not None else None
+
+    def translatesAutoresizingMaskIntoConstraints(self):
+        return self._translates
+
+    def setTranslatesAutoresizingMaskIntoConstraints_(self, value):
+        self._translates = value
+
+    def safeAreaLayoutGuide(self):
+        if self._safe_area is None:
+            self._safe_area = ObjCLayoutGuide('safe_area')
+            self._safe_area.setOwningView_(self)
+        return self._safe_area
+
+    def layoutMarginsGuide(self):
+        if self._margins is None:
+            self._margins = ObjCLayoutGuide('margins')
+            self._margins.setOwningView_(self)
+        return self._margins
+
+    def addLayoutGuide_(self, guide):
+        self._guides.append(guide)
+        guide.setOwningView_(self)
+
+    def removeLayoutGuide_(self, guide):
+        self._guides.remove(guide)
+        guide.setOwningView_(None)
+
+    def layoutGuides(self):
+        return list(self._guides)
+
+    def sizeThatFits_(self, size):
+        text = getattr(self.view, 'text', None) or \
+            getattr(self.view, 'title', None) or ''
+        return Size(width=7.0 * len(text), height=20.0)
+
+    def hasAmbiguousLayout(self):
+        return False
+
+    def exerciseAmbiguityInLayout(self):
+        pass
+
+    def __repr__(self):
+        name = f"; name = '{self.view.name}'" if self.view.name else ''
+        return f'<{type(self.view).__name__}: {hex(self.address)}{name}>'
+
+
+@bridged
+class ObjCLayoutGuide:
+
+    def __init__(self, guide_type='layout'):
+        self.address = next(_ids)
+        self._owner = None
+        self._guide_type = guide_type
+        self._item = None
+
+    @classmethod
+    def new(cls):
+        return cls()
+
+    def autorelease(self):
+        return self
+
+    def owningView(self):
+        return self._owner
+
+    def setOwningView_(self, view):
+        self._owner = view
+
+    def superview(self):
+        return self._owner
+
+    def __repr__(self):
+        return f'<UILayoutGuide: {hex(self.address)}>'
+
+
+@bridged
+class ObjCConstraint:
+
+    def __init__(self, first, first_attribute, relation, second,
+            second_attribute, multiplier, constant, priority):
+        self.address = next(_ids)
+        self._first = first
+        self._first_attribute = first_attribute
+        self._relation = relation
+        self._second = second
+        self._second_attribute = second_attribute
+        self._multiplier = multiplier
+        self._constant = constant
+        self._priority = priority
+        self._active = False
+        self._installed_on = None
+
+    @classmethod
+    def PG_constraintWithItem_attribute_relatedBy_toItem_attribute_multiplier_constant_priority_(
+            cls, *args):
+        return cls(*args)
+
+    @classmethod
+    def activateConstraints_(cls, constraints):
+        for constraint in constraints:
+            set_active(constraint, True)
+
+    @classmethod
+    def deactivateConstraints_(cls, constraints):
+        for constraint in constraints:
+            set_active(constraint, False)
+
+    def firstItem(self):
+        return self._first
+
+    def secondItem(self):
+        return self._second
+
+    def firstAttribute(self):
+        return self._first_attribute
+
+    def secondAttribute(self):
+        return self._second_attribute
+
+    def relation(self):
+        return self._relation
+
+    def multiplier(self):
+        return self._multiplier
+
+    def constant(self):
+        return self._constant
+
+    def setConstant_(self, value):
+        self._constant = value
+
+    def priority(self):
+        return self._priority
+
+    def setPriority_(self, value):
+        self._priority = value
+
+    def active(self):
+        return self._active
+
+    def setActive_(self, value):
+        set_active(self, value)
+
+    def _deallocSafeDescription(self):
+        return (f'<NSLayoutConstraint:{hex(self.address)} '
+                f'{self._first!r}.{self._first_attribute} '
+                f'{["<=", "==", ">="][self._relation + 1]} '
+                f'{self._second!r}.{self._second_attribute} '
+                f'* {self._multiplier} + {self._constant}>')
+
+
+def set_active(constraint, value):
+    if value == constraint._active:
+        return
+    constraint._active = value
+    if value:
+        constraint._installed_on = common_ancestor(
+            constraint._first, constraint._second)
+        constraint._installed_on._constraints.append(constraint)
+    else:
+        constraint._installed_on._constraints.remove(constraint)
+        constraint._installed_on = None
+
+
+def common_ancestor(first, second):
+    """View that UIKit would install a constraint between the items on."""
+    first = _owning_view(first)
+    if second is None:
+        return first
+    ancestors = []
+    view = first
+    while view is not None:
+        ancestors.append(view)
+        view = _parent(view)
+    view = _owning_view(second)
+    while view is not None:
+        if any(view is ancestor for ancestor in ancestors):
+            return view
+        view = _parent(view)
+    return first
+
+
+def _owning_view(item):
+    return item._owner if isinstance(item, ObjCLayoutGuide) else item
+
+
+def _parent(objc_view):
+    superview = objc_view.view.superview
+    return superview.objc_instance if superview is not None else None
+
+
+@bridged
+class ObjCTraitCollection:
+
+    def userInterfaceIdiom(self):
+        return interface_idiom
+
+    def horizontalSizeClass(self):
+        width, height = screen_size
+        return 1 if interface_idiom == 0 and width < height else 2
+
+    def verticalSizeClass(self):
+        width, height = screen_size
+        return 1 if interface_idiom == 0 and width > height else 2
+
+
+@bridged
+class ObjCWindow:
+
+    def traitCollection(self):
+        return ObjCTraitCollection()
+
+
+@bridged
+class ObjCApplication:
+
+    @classmethod
+    def sharedApplication(cls):
+        return cls()
+
+    def keyWindow(self):
+        return ObjCWindow()
+
+
+class ObjCPlaceholder:
+    pass
+
+
+objc_classes = {
+    'NSLayoutConstraint': ObjCConstraint,
+    'UILayoutGuide': ObjCLayoutGuide,
+    'UIApplication': ObjCApplication,
+}
+
+
+def ObjCClass(name):
+    return objc_classes.get(name, ObjCPlaceholder)
+
+
+# ui stand-ins
+
+screen_size = (1024.0, 768.0)
+# 0 for phone, 1 for pad
+interface_idiom = 1
+
+
+def get_screen_size():
+    return screen_size
+
+
+class View:
+
+    def __init__(self, **kwargs):
+        self.name = None
+        self.superview = None
+        self._subviews = []
+        self._frame = (0.0, 0.0, 100.0, 100.0)
+        self.border_width = 0
+        self.objc_instance = ObjCView(self)
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    @property
+    def frame(self):
+        return self._frame
+
+    @frame.setter
+    def frame(self, value):
+        self._frame = tuple(value)
+
+    @property
+    def bounds(self):
+        return (0.0, 0.0, self._frame[2], self._frame[3])
+
+    @property
+    def x(self):
+        return self._frame[0]
+
+    @property
+    def y(self):
+        return self._frame[1]
+
+    @property
+    def width(self):
+        return self._frame[2]
+
+    @width.setter
+    def width(self, value):
+        x, y, _, h = self._frame
+        self.frame = (x, y, value, h)
+
+    @property
+    def height(self):
+        return self._frame[3]
+
+    @height.setter
+    def height(self, value):
+        x, y, w, _ = self._frame
+        self.frame = (x, y, w, value)
+
+    @property
+    def subviews(self):
+        return tuple(self._subviews)
+
+    @property
+    def on_screen(self):
+        return False
+
+    def add_subview(self, view):
+        if view.superview is not None:
+            view.superview.remove_subview(view)
+        view.superview = self
+        self._subviews.append(view)
+
+    def remove_subview(self, view):
+        if view.superview is self:
+            _remove_outside_constraints(view)
+            view.superview = None
+            self._subviews.remove(view)
+
+    def layout(self):
+        pass
+
+    def present(self, style='default', *args, **kwargs):
+        if style == 'fullscreen':
+            self.frame = (0.0, 0.0) + tuple(screen_size)
+        layout(self)
+
+    def close(self):
+        pass
+
+    def __getitem__(self, name):
+        for view in self._subviews:
+            if view.name == name:
+                return view
+
+
+class Label(View):
+    pass
+
+
+class Button(View):
+    pass
+
+
+class TextField(View):
+    pass
+
+
+class ImageView(View):
+    pass
+
+
+class ScrollView(View):
+
+    def __init__(self, **kwargs):
+        self.content_offset = (0.0, 0.0)
+        self.content_size = (0.0, 0.0)
+        self.delegate = None
+        super().__init__(**kwargs)
+
+    def scroll_to(self, x, y):
+        self.content_offset = (x, y)
+        if self.delegate is not None:
+            self.delegate.scrollview_did_scroll(self)
+
+
+class Path:
+
+    def move_to(self, x, y):
+        pass
+
+    def line_to(self, x, y):
+        pass
+
+    def stroke(self):
+        pass
+
+
+def set_color(color):
+    pass
+
+
+def _remove_outside_constraints(view):
+    """Like UIKit, deactivates the constraints between a view about to be
+    removed, or its subviews, and views outside of it."""
+    subtree = set()
+    pending = [view]
+    while pending:
+        current = pending.pop()
+        subtree.add(id(current.objc_instance))
+        pending.extend(current.subviews)
+    ancestor = view.superview
+    while ancestor is not None:
+        for constraint in list(ancestor.objc_instance._constraints):
+            if id(_owning_view(constraint._first)) in subtree or (
+                    constraint._second is not None and
+                    id(_owning_view(constraint._second)) in subtree):
+                set_active(constraint, False)
+        ancestor = ancestor.superview
+
+
+# Layout
+
+_delayed = []
+
+
+def delay(func, seconds):
+    """Stand-in for `ui.delay`. The functions run on the next call of
+    `run_delayed` or `layout`, regardless of `seconds`."""
+    _delayed.append(func)
+
+
+def cancel_delays():
+    _delayed.clear()
+
+
+def run_delayed():
+    """Runs the functions given to `delay`, as the next turn of the main
+    run loop would."""
+    while _delayed:
+        delayed = list(_delayed)
+        _delayed.clear()
+        for func in delayed:
+            func()
+
+
+def layout(root, safe_area_insets=(0, 0, 0, 0)):
+    """Computes the frames of the constrained views under `root` from their
+    active constraints, and sets them. Then calls `layout()` of every view,
+    top down, like UIKit does after solving the constraints. Functions given
+    to `delay` are run first.
+
+    `safe_area_insets` are given in UIEdgeInsets order: top, left, bottom,
+    right."""
+    import anchor_solver
+
+    run_delayed()
+    backend = anchor_solver.SolverBackend(safe_area_insets)
+    for constraint in active_constraints(root):
+        second = constraint._second
+        anchor_solver.LayoutConstraint(backend, ConstraintRecord(
+            objc_constraint=constraint,
+            view=_layout_item(constraint._first),
+            attribute=constraint._first_attribute,
+            operator=constraint._relation,
+            other_view=_layout_item(second) if second is not None else None,
+            other_attribute=constraint._second_attribute,
+            multiplier=constraint._multiplier,
+            constant=constraint._constant,
+            _priority=constraint._priority,
+        )).setActive_(True)
+    backend.layout(root)
+    _call_layout(root)
+
+
+class ConstraintRecord(SimpleNamespace):
+    """Constraint values in the form the solver backend reads them from
+    anchor's constraints."""
+
+    def __str__(self):
+        return self.objc_constraint._deallocSafeDescription()
+
+
+def active_constraints(root):
+    """Returns the active constraints installed on the views under `root`."""
+    constraints = list(root.objc_instance._constraints)
+    for subview in root.subviews:
+        constraints.extend(active_constraints(subview))
+    return constraints
+
+
+def _layout_item(objc_item):
+    """The object that stands for a view or a guide in the solver."""
+    if isinstance(objc_item, ObjCView):
+        return objc_item.view
+    if objc_item._item is None:
+        owner = objc_item._owner.view
+        if objc_item._guide_type == 'layout':
+            objc_item._item = SimpleNamespace(
+                guide_type='layout', view=owner)
+        else:
+            objc_item._item = SimpleNamespace(
+                guide_type=objc_item._guide_type, superview=owner)
+    return objc_item._item
+
+
+def _call_layout(view):
+    view.layout()
+    for subview in view.subviews:
+        _call_layout(subview)
+
+
+def install():
+    """Registers the stand-ins as the `objc_util` and `ui` modules."""
+    objc_util = types.ModuleType('objc_util')
+    objc_util.ObjCClass = ObjCClass
+    objc_util.on_main_thread = on_main_thread
+    objc_util.UIApplication = ObjCApplication
+    sys.modules['objc_util'] = objc_util
+
+    ui = types.ModuleType('ui')
+    for cls in (View, Label, Button, TextField, ImageView, ScrollView, Path):
+        setattr(ui, cls.__name__, cls)
+    ui.get_screen_size = get_screen_size
+    ui.delay = delay
+    ui.cancel_delays = cancel_delays
+    ui.set_color = set_color
+    ui.ALIGN_LEFT, ui.ALIGN_CENTER, ui.ALIGN_RIGHT = 0, 1, 2
+    sys.modules['ui'] = ui
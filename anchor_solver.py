@@ -0,0 +1,874 @@
+# coding: utf-8
+
+"""
+Pure-Python Cassowary constraint solver, and an anchor backend that uses it
+to lay out views without UIKit.
+
+The solver is an incremental dual simplex solver in the style of the
+Cassowary paper (Badros, Borning & Stuckey) and its kiwi implementation.
+The tableau keeps a column index, so that pivots, substitutions and edits
+only touch the rows that actually contain the symbols involved.
+
+To compute layouts without UIKit, replace the anchor backend before
+creating constraints:
+
+    import anchor, anchor_solver
+    anchor.backend = solver_backend = anchor_solver.SolverBackend()
+    ...
+    solver_backend.layout(root_view)
+"""
+
+import math
+import warnings
+
+LE = -1
+EQ = 0
+GE = 1
+
+REQUIRED = 1001001000.0
+STRONG = 1000000.0
+MEDIUM = 1000.0
+WEAK = 1.0
+
+EPSILON = 1.0e-8
+
+
+class SolverError(Exception):
+    pass
+
+
+class UnsatisfiableConstraint(SolverError):
+    pass
+
+
+class Variable:
+    """Unknown value solved by the `Solver`."""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name=''):
+        self.name = name
+
+    def __repr__(self):
+        return f'Variable({self.name!r})'
+
+
+class Constraint:
+    """
+    Linear constraint `sum(coefficient * variable) + constant OP 0`, where
+    `terms` is a dict of variables to coefficients and `op` is one of `LE`,
+    `EQ` or `GE`.
+    """
+
+    __slots__ = ('terms', 'constant', 'op', 'strength')
+
+    def __init__(self, terms, constant=0.0, op=EQ, strength=REQUIRED):
+        self.terms = terms
+        self.constant = constant
+        self.op = op
+        self.strength = min(max(strength, 0.0), REQUIRED)
+
+    @property
+    def required(self):
+        return self.strength >= REQUIRED
+
+
+EXTERNAL, SLACK, ERROR, DUMMY = range(4)
+
+
+class Symbol:
+
+    __slots__ = ('type',)
+
+    def __init__(self, type):
+        self.type = type
+
+
+class Row:
+    """Tableau row `basic = constant + sum(coefficient * symbol)`."""
+
+    __slots__ = ('cells', 'constant')
+
+    def __init__(self, constant=0.0, cells=None):
+        self.constant = constant
+        self.cells = {} if cells is None else cells
+
+    def copy(self):
+        return Row(self.constant, dict(self.cells))
+
+    def insert_symbol(self, symbol, coefficient=1.0):
+        value = self.cells.get(symbol, 0.0) + coefficient
+        if abs(value) < EPSILON:
+            self.cells.pop(symbol, None)
+        else:
+            self.cells[symbol] = value
+
+    def insert_row(self, row, coefficient=1.0):
+        self.constant += row.constant * coefficient
+        for symbol, value in row.cells.items():
+            self.insert_symbol(symbol, value * coefficient)
+
+    def reverse_sign(self):
+        self.constant = -self.constant
+        self.cells = {
+            symbol: -value for symbol, value in self.cells.items()}
+
+    def solve_for(self, symbol):
+        """Solves the row for `symbol`, which is removed from the cells."""
+        coefficient = -1.0 / self.cells.pop(symbol)
+        self.constant *= coefficient
+        self.cells = {
+            other: value * coefficient
+            for other, value in self.cells.items()}
+
+    def solve_for_ex(self, lhs, rhs):
+        """Solves the row `lhs = self` for `rhs`."""
+        self.insert_symbol(lhs, -1.0)
+        self.solve_for(rhs)
+
+
+class Tag:
+
+    __slots__ = ('marker', 'other')
+
+    def __init__(self):
+        self.marker = None
+        self.other = None
+
+
+class Solver:
+    """
+    Incremental Cassowary solver. Constraints can be added and removed at any
+    time, and values of edit variables suggested, each time updating the
+    existing solution instead of solving the whole system again.
+    """
+
+    def __init__(self):
+        self._constraints = {}
+        self._rows = {}
+        self._columns = {}
+        self._vars = {}
+        self._edits = {}
+        self._infeasible_rows = []
+        self._objective = Row()
+        self._artificial = None
+
+    def has_constraint(self, constraint):
+        return constraint in self._constraints
+
+    def add_constraint(self, constraint):
+        if constraint in self._constraints:
+            raise SolverError('Constraint already added to the solver')
+        tag = Tag()
+        row = self._create_row(constraint, tag)
+        subject = self._choose_subject(row, tag)
+        if subject is None and all(
+                symbol.type == DUMMY for symbol in row.cells):
+            if abs(row.constant) >= EPSILON:
+                raise UnsatisfiableConstraint(
+                    'Unable to satisfy a required constraint')
+            subject = tag.marker
+        if subject is None:
+            if not self._add_with_artificial_variable(row):
+                raise UnsatisfiableConstraint(
+                    'Unable to satisfy a required constraint')
+        else:
+            row.solve_for(subject)
+            self._substitute(subject, row)
+            self._insert_row(subject, row)
+        self._constraints[constraint] = tag
+        self._optimize(self._objective)
+
+    def remove_constraint(self, constraint):
+        try:
+            tag = self._constraints.pop(constraint)
+        except KeyError:
+            raise SolverError('Constraint not in the solver') from None
+        self._remove_constraint_effects(constraint, tag)
+        marker = tag.marker
+        row = self._remove_row(marker)
+        if row is None:
+            leaving = self._marker_leaving_symbol(marker)
+            if leaving is None:
+                raise SolverError('Failed to find a leaving row')
+            row = self._remove_row(leaving)
+            row.solve_for_ex(leaving, marker)
+            self._substitute(marker, row)
+        self._columns.pop(marker, None)
+        self._optimize(self._objective)
+
+    def add_edit_variable(self, variable, strength=STRONG):
+        """Makes the variable suggestable with `suggest_value`."""
+        if variable in self._edits:
+            raise SolverError('Edit variable already added to the solver')
+        if strength >= REQUIRED:
+            raise SolverError('Edit variable cannot have required strength')
+        constraint = Constraint({variable: 1.0}, 0.0, EQ, strength)
+        self.add_constraint(constraint)
+        self._edits[variable] = constraint
+
+    def remove_edit_variable(self, variable):
+        try:
+            constraint = self._edits.pop(variable)
+        except KeyError:
+            raise SolverError('Unknown edit variable') from None
+        self.remove_constraint(constraint)
+
+    def has_edit_variable(self, variable):
+        return variable in self._edits
+
+    def suggest_value(self, variable, value):
+        try:
+            constraint = self._edits[variable]
+        except KeyError:
+            raise SolverError('Unknown edit variable') from None
+        self.set_constant(constraint, -value)
+
+    def set_constant(self, constraint, constant):
+        """
+        Changes the constant of a constraint in the solver, updating the
+        existing solution instead of removing and adding the constraint.
+
+        A change of the constant is equivalent to shifting the marker symbol
+        of the constraint, so only the rows containing the marker need to be
+        updated before re-optimizing.
+
+        If the new constant makes the required constraints unsatisfiable,
+        the previous constant is restored and `UnsatisfiableConstraint`
+        raised.
+        """
+        try:
+            tag = self._constraints[constraint]
+        except KeyError:
+            raise SolverError('Constraint not in the solver') from None
+        delta = constant - constraint.constant
+        if delta == 0.0:
+            return
+        # Coefficient of the marker in the original constraint row
+        if constraint.op == LE or (
+                constraint.op == EQ and constraint.strength >= REQUIRED):
+            delta = -delta
+        if not self._shift_marker(tag.marker, delta):
+            self._shift_marker(tag.marker, -delta)
+            self._infeasible_rows.clear()
+            raise UnsatisfiableConstraint(
+                'Unable to satisfy a required constraint')
+        try:
+            self._dual_optimize()
+        except UnsatisfiableConstraint:
+            # Shifting the marker back restores the previous, feasible
+            # system in whatever basis the failed optimization left
+            self._infeasible_rows.clear()
+            self._shift_marker(tag.marker, -delta)
+            self._infeasible_rows[:] = [
+                basic for basic, row in self._rows.items()
+                if basic.type != EXTERNAL and row.constant < 0.0]
+            self._dual_optimize()
+            raise
+        constraint.constant = constant
+
+    def _shift_marker(self, marker, delta):
+        """Substitutes `marker + delta` for the marker symbol. Returns False
+        if a redundant required equality becomes unsatisfiable."""
+        rows = self._rows
+        infeasible_rows = self._infeasible_rows
+        consistent = True
+        row = rows.get(marker)
+        if row is not None:
+            row.constant += delta
+            basics = (marker,)
+        else:
+            basics = self._columns.get(marker, ())
+            for basic in basics:
+                row = rows[basic]
+                row.constant -= delta * row.cells[marker]
+        for basic in basics:
+            row = rows[basic]
+            if basic.type == DUMMY:
+                consistent = consistent and abs(row.constant) < EPSILON
+            elif basic.type != EXTERNAL and row.constant < 0.0:
+                infeasible_rows.append(basic)
+        return consistent
+
+    def value(self, variable):
+        symbol = self._vars.get(variable)
+        if symbol is None:
+            return 0.0
+        row = self._rows.get(symbol)
+        return 0.0 if row is None else row.constant
+
+    # Tableau maintenance
+
+    def _insert_row(self, basic, row):
+        self._rows[basic] = row
+        columns = self._columns
+        for symbol in row.cells:
+            column = columns.get(symbol)
+            if column is None:
+                columns[symbol] = {basic}
+            else:
+                column.add(basic)
+
+    def _remove_row(self, basic):
+        row = self._rows.pop(basic, None)
+        if row is not None:
+            columns = self._columns
+            for symbol in row.cells:
+                columns[symbol].discard(basic)
+        return row
+
+    def _substitute(self, symbol, row):
+        """Replaces `symbol` with `row` everywhere in the tableau."""
+        rows = self._rows
+        columns = self._columns
+        new_cells = row.cells
+        for basic in columns.pop(symbol, ()):
+            basic_row = rows[basic]
+            cells = basic_row.cells
+            coefficient = cells.pop(symbol)
+            basic_row.constant += row.constant * coefficient
+            for other, value in new_cells.items():
+                current = cells.get(other)
+                if current is None:
+                    cells[other] = value * coefficient
+                    column = columns.get(other)
+                    if column is None:
+                        columns[other] = {basic}
+                    else:
+                        column.add(basic)
+                else:
+                    current += value * coefficient
+                    if abs(current) < EPSILON:
+                        del cells[other]
+                        columns[other].discard(basic)
+                    else:
+                        cells[other] = current
+            if basic.type != EXTERNAL and basic_row.constant < 0.0:
+                self._infeasible_rows.append(basic)
+        objective = self._objective
+        if symbol in objective.cells:
+            coefficient = objective.cells.pop(symbol)
+            objective.insert_row(row, coefficient)
+        artificial = self._artificial
+        if artificial is not None and symbol in artificial.cells:
+            coefficient = artificial.cells.pop(symbol)
+            artificial.insert_row(row, coefficient)
+
+    def _pivot(self, leaving, entering):
+        row = self._remove_row(leaving)
+        row.solve_for_ex(leaving, entering)
+        self._substitute(entering, row)
+        self._insert_row(entering, row)
+
+    def _create_row(self, constraint, tag):
+        row = Row(constraint.constant)
+        rows = self._rows
+        for variable, coefficient in constraint.terms.items():
+            if abs(coefficient) < EPSILON:
+                continue
+            symbol = self._vars.get(variable)
+            if symbol is None:
+                symbol = self._vars[variable] = Symbol(EXTERNAL)
+            basic_row = rows.get(symbol)
+            if basic_row is not None:
+                row.insert_row(basic_row, coefficient)
+            else:
+                row.insert_symbol(symbol, coefficient)
+
+        objective = self._objective
+        strength = constraint.strength
+        if constraint.op != EQ:
+            coefficient = 1.0 if constraint.op == LE else -1.0
+            slack = Symbol(SLACK)
+            tag.marker = slack
+            row.insert_symbol(slack, coefficient)
+            if strength < REQUIRED:
+                error = Symbol(ERROR)
+                tag.other = error
+                row.insert_symbol(error, -coefficient)
+                objective.insert_symbol(error, strength)
+        elif strength < REQUIRED:
+            plus = Symbol(ERROR)
+            minus = Symbol(ERROR)
+            tag.marker = plus
+            tag.other = minus
+            row.insert_symbol(plus, -1.0)
+            row.insert_symbol(minus, 1.0)
+            objective.insert_symbol(plus, strength)
+            objective.insert_symbol(minus, strength)
+        else:
+            dummy = Symbol(DUMMY)
+            tag.marker = dummy
+            row.insert_symbol(dummy)
+
+        if row.constant < 0.0:
+            row.reverse_sign()
+        return row
+
+    def _choose_subject(self, row, tag):
+        for symbol in row.cells:
+            if symbol.type == EXTERNAL:
+                return symbol
+        for symbol in (tag.marker, tag.other):
+            if symbol is not None and symbol.type in (SLACK, ERROR):
+                if row.cells.get(symbol, 0.0) < 0.0:
+                    return symbol
+        return None
+
+    def _add_with_artificial_variable(self, row):
+        artificial = Symbol(SLACK)
+        self._insert_row(artificial, row.copy())
+        self._artificial = row.copy()
+        self._optimize(self._artificial)
+        success = abs(self._artificial.constant) < EPSILON
+        self._artificial = None
+
+        # Dropping the row of a basic artificial variable restores the
+        # tableau without the new constraint
+        artificial_row = self._remove_row(artificial)
+        if artificial_row is not None:
+            if not success or not artificial_row.cells:
+                return success
+            entering = next(
+                (symbol for symbol in artificial_row.cells
+                 if symbol.type in (SLACK, ERROR)), None)
+            if entering is None:
+                return False
+            artificial_row.solve_for_ex(artificial, entering)
+            self._substitute(entering, artificial_row)
+            self._insert_row(entering, artificial_row)
+
+        for basic in self._columns.pop(artificial, ()):
+            del self._rows[basic].cells[artificial]
+        self._objective.cells.pop(artificial, None)
+        return success
+
+    def _optimize(self, objective):
+        while True:
+            entering = next(
+                (symbol for symbol, value in objective.cells.items()
+                 if value < 0.0 and symbol.type != DUMMY), None)
+            if entering is None:
+                return
+            leaving = None
+            ratio = math.inf
+            rows = self._rows
+            for basic in self._columns.get(entering, ()):
+                if basic.type == EXTERNAL:
+                    continue
+                row = rows[basic]
+                coefficient = row.cells[entering]
+                if coefficient < 0.0:
+                    candidate = -row.constant / coefficient
+                    if candidate < ratio:
+                        ratio = candidate
+                        leaving = basic
+            if leaving is None:
+                raise SolverError('The objective is unbounded')
+            self._pivot(leaving, entering)
+
+    def _dual_optimize(self):
+        rows = self._rows
+        objective_cells = self._objective.cells
+        infeasible_rows = self._infeasible_rows
+        while infeasible_rows:
+            leaving = infeasible_rows.pop()
+            row = rows.get(leaving)
+            if row is None or row.constant >= 0.0:
+                continue
+            entering = None
+            ratio = math.inf
+            for symbol, value in row.cells.items():
+                if value > 0.0 and symbol.type != DUMMY:
+                    candidate = objective_cells.get(symbol, 0.0) / value
+                    if candidate < ratio:
+                        ratio = candidate
+                        entering = symbol
+            if entering is None:
+                infeasible_rows.clear()
+                raise UnsatisfiableConstraint(
+                    'Unable to satisfy a required constraint')
+            self._pivot(leaving, entering)
+
+    def _remove_constraint_effects(self, constraint, tag):
+        for marker in (tag.marker, tag.other):
+            if marker is not None and marker.type == ERROR:
+                row = self._rows.get(marker)
+                if row is not None:
+                    self._objective.insert_row(row, -constraint.strength)
+                else:
+                    self._objective.insert_symbol(
+                        marker, -constraint.strength)
+
+    def _marker_leaving_symbol(self, marker):
+        first = second = third = None
+        first_ratio = second_ratio = math.inf
+        rows = self._rows
+        for basic in self._columns.get(marker, ()):
+            row = rows[basic]
+            coefficient = row.cells[marker]
+            if basic.type == EXTERNAL:
+                third = basic
+            elif coefficient < 0.0:
+                ratio = -row.constant / coefficient
+                if ratio < first_ratio:
+                    first_ratio = ratio
+                    first = basic
+            else:
+                ratio = row.constant / coefficient
+                if ratio < second_ratio:
+                    second_ratio = ratio
+                    second = basic
+        return first or second or third
+
+
+# Anchor backend
+
+# Attribute codes of NSLayoutConstraint mapped to the coefficients of the
+# item frame variables: (axis, position, size, margin), where axis 0 is
+# horizontal and 1 vertical. Leading and trailing assume a left-to-right
+# layout, and baselines are approximated by the top and bottom edges.
+ATTRIBUTES = {
+    1: (0, 1.0, 0.0, 0.0),   # left
+    2: (0, 1.0, 1.0, 0.0),   # right
+    3: (1, 1.0, 0.0, 0.0),   # top
+    4: (1, 1.0, 1.0, 0.0),   # bottom
+    5: (0, 1.0, 0.0, 0.0),   # leading
+    6: (0, 1.0, 1.0, 0.0),   # trailing
+    7: (0, 0.0, 1.0, 0.0),   # width
+    8: (1, 0.0, 1.0, 0.0),   # height
+    9: (0, 1.0, 0.5, 0.0),   # center_x
+    10: (1, 1.0, 0.5, 0.0),  # center_y
+    11: (1, 1.0, 1.0, 0.0),  # last_baseline
+    12: (1, 1.0, 0.0, 0.0),  # first_baseline
+    13: (0, 1.0, 0.0, 1.0),  # left_margin
+    14: (0, 1.0, 1.0, -1.0),  # right_margin
+    15: (1, 1.0, 0.0, 1.0),  # top_margin
+    16: (1, 1.0, 1.0, -1.0),  # bottom_margin
+    17: (0, 1.0, 0.0, 1.0),  # leading_margin
+    18: (0, 1.0, 1.0, -1.0),  # trailing_margin
+}
+
+
+def strength(priority):
+    """Maps a UIKit priority (0-1000) to a solver strength. Optional
+    priorities stay well below the `STRONG` strength used to hold views
+    that are laid out with frames in place."""
+    if priority >= 1000:
+        return REQUIRED
+    return 10 ** (priority / 250)
+
+
+class LayoutItem:
+    """Frame variables of a view or a layout guide, in the coordinates of
+    the root view."""
+
+    __slots__ = ('view', 'guide_type', 'left', 'top', 'width', 'height',
+                 'constrained', 'pins', 'pinned_frame', 'pinned_parent')
+
+    def __init__(self, view, guide_type):
+        name = getattr(view, 'name', None) or type(view).__name__
+        self.view = view
+        self.guide_type = guide_type
+        self.left = Variable(f'{name}.left')
+        self.top = Variable(f'{name}.top')
+        self.width = Variable(f'{name}.width')
+        self.height = Variable(f'{name}.height')
+        self.constrained = False
+        self.pins = None
+        self.pinned_frame = None
+        self.pinned_parent = None
+
+    def terms(self, attribute, coefficient, terms, margin):
+        """Adds the terms of the attribute multiplied by the coefficient
+        into the terms dict, and returns the constant part."""
+        axis, position, size, margin_factor = ATTRIBUTES[attribute]
+        if position:
+            variable = self.top if axis else self.left
+            terms[variable] = terms.get(variable, 0.0) + \
+                position * coefficient
+        variable = self.height if axis else self.width
+        terms[variable] = terms.get(variable, 0.0) + size * coefficient
+        return margin_factor * margin * coefficient
+
+
+class LayoutConstraint:
+    """
+    Solver counterpart of an NSLayoutConstraint, responding to the same
+    methods that anchor uses.
+    """
+
+    def __init__(self, backend, constraint):
+        self.backend = backend
+        self.first = backend.item(constraint.view, constrained=True)
+        self.first_attribute = constraint.attribute
+        self.relation = constraint.operator
+        self.second = (
+            backend.item(constraint.other_view)
+            if constraint.other_view is not None and
+               constraint.other_attribute else None)
+        self.second_attribute = constraint.other_attribute
+        self._multiplier = constraint.multiplier
+        self._constant = constraint.constant
+        self._priority = constraint._priority
+        self.text = str(constraint)
+        self.constraint = None
+
+    def _solver_constraint(self):
+        terms = {}
+        margin = self.backend.margin
+        constant = self.first.terms(
+            self.first_attribute, 1.0, terms, margin)
+        if self.second is not None:
+            constant += self.second.terms(
+                self.second_attribute, -self._multiplier, terms, margin)
+        return Constraint(
+            terms, constant - self._constant, self.relation,
+            strength(self._priority))
+
+    def firstItem(self):
+        return self.first.view
+
+    def secondItem(self):
+        return self.second.view if self.second is not None else None
+
+    def firstAttribute(self):
+        return self.first_attribute
+
+    def secondAttribute(self):
+        return self.second_attribute
+
+    def multiplier(self):
+        return self._multiplier
+
+    def constant(self):
+        return self._constant
+
+    def setConstant_(self, value):
+        if self.constraint is not None:
+            try:
+                self.backend.solver.set_constant(
+                    self.constraint,
+                    self.constraint.constant - (value - self._constant))
+            except UnsatisfiableConstraint:
+                # Like UIKit, break the constraint that no longer fits
+                warnings.warn(
+                    f'Unable to simultaneously satisfy constraints, '
+                    f'breaking {self}', RuntimeWarning, stacklevel=2)
+                self.setActive_(False)
+        self._constant = value
+
+    def priority(self):
+        return self._priority
+
+    def setPriority_(self, value):
+        self._priority = value
+        self._replace()
+
+    def active(self):
+        return self.constraint is not None
+
+    def setActive_(self, value):
+        solver = self.backend.solver
+        if value and self.constraint is None:
+            constraint = self._solver_constraint()
+            try:
+                solver.add_constraint(constraint)
+            except UnsatisfiableConstraint:
+                # Like UIKit, leave out the conflicting constraint
+                warnings.warn(
+                    f'Unable to simultaneously satisfy constraints, '
+                    f'breaking {self}', RuntimeWarning, stacklevel=2)
+                return
+            self.constraint = constraint
+        elif not value and self.constraint is not None:
+            solver.remove_constraint(self.constraint)
+            self.constraint = None
+
+    def _replace(self):
+        if self.constraint is not None:
+            self.setActive_(False)
+            self.setActive_(True)
+
+    def __str__(self):
+        return f'<LayoutConstraint:{hex(id(self))} {self.text}>'
+
+    def _deallocSafeDescription(self):
+        """Description with the current constant and priority, like the
+        one of NSLayoutConstraint."""
+        def name(view):
+            return getattr(view, 'name', None) or type(view).__name__
+        second = (
+            f'{name(self.second.view)}.{self.second_attribute}'
+            if self.second is not None else 'None')
+        return (f'<LayoutConstraint:{hex(id(self))} '
+                f'{name(self.first.view)}.{self.first_attribute} '
+                f'{["<=", "==", ">="][self.relation + 1]} {second} '
+                f'* {self._multiplier} + {self._constant} '
+                f'@{self._priority}>')
+
+
+class SolverBackend:
+    """
+    anchor backend that resolves constraints with the `Solver` instead of
+    UIKit, so that layouts can be computed and checked without a device.
+
+    Views that are not the target of any constraint keep their frames, like
+    views with `translatesAutoresizingMaskIntoConstraints` in UIKit. Call
+    `layout(root)` to solve and assign the frames of constrained views, or
+    `frame(view)` to read a single solved frame.
+    """
+
+    margin = 8
+
+    def __init__(self, safe_area_insets=(0, 0, 0, 0)):
+        """`safe_area_insets` are given in UIEdgeInsets order: top, left,
+        bottom, right."""
+        self.solver = Solver()
+        self.safe_area_insets = safe_area_insets
+        self._items = {}
+        self._pinned = {}
+
+    def activate(self, constraints, active=True):
+        handles = [
+            LayoutConstraint(self, constraint)
+            for constraint in constraints]
+        for constraint, handle in zip(constraints, handles):
+            if active:
+                handle.setActive_(True)
+            constraint._set_objc_constraint(handle)
+
+    def deactivate(self, handles):
+        for handle in handles:
+            handle.setActive_(False)
+
+    def reactivate(self, handles):
+        for handle in handles:
+            handle.setActive_(True)
+
+    def item(self, view, constrained=False):
+        """Returns the `LayoutItem` for a view, guide or the safe area and
+        margins pseudo-views, creating it if needed."""
+        key = self._key(view)
+        item = self._items.get(key)
+        if item is None:
+            guide_type = getattr(view, 'guide_type', None)
+            item = self._items[key] = LayoutItem(view, guide_type)
+            if guide_type in ('safe_area', 'margins'):
+                self._inset(item, self.item(view.superview))
+            elif guide_type is None and not constrained:
+                self._pin(item)
+        if constrained and not item.constrained:
+            item.constrained = True
+            if item.pins is not None:
+                self._unpin(item)
+        return item
+
+    def solve(self):
+        """Updates the solver with the current frames of the views that are
+        not constrained."""
+        suggest = self.solver.suggest_value
+        for item in list(self._pinned.values()):
+            view = item.view
+            if view.superview is not item.pinned_parent:
+                self._unpin(item)
+                self._pin(item)
+                continue
+            frame = tuple(view.frame)
+            if frame != item.pinned_frame:
+                offset_x, offset_y = item.pins[:2]
+                for variable, old, new in zip(
+                        (offset_x, offset_y, item.width, item.height),
+                        item.pinned_frame, frame):
+                    if old != new:
+                        suggest(variable, new)
+                item.pinned_frame = frame
+
+    def frame(self, view):
+        """Solved frame of the view in the coordinates of its superview, or
+        of its owning view for layout guides."""
+        item = self._items[self._key(view)]
+        value = self.solver.value
+        x = value(item.left)
+        y = value(item.top)
+        parent = self._parent(item)
+        if parent is not None:
+            parent_item = self._items.get(self._key(parent))
+            if parent_item is not None:
+                x -= value(parent_item.left)
+                y -= value(parent_item.top)
+        return (x, y, value(item.width), value(item.height))
+
+    def layout(self, view):
+        """Solves, and sets the frames of all constrained views in the view
+        hierarchy starting with the given view."""
+        self.solve()
+        self._apply_frames(view)
+
+    def _apply_frames(self, view):
+        item = self._items.get(self._key(view))
+        if item is not None and item.constrained:
+            view.frame = self.frame(view)
+        for subview in view.subviews:
+            self._apply_frames(subview)
+
+    def _key(self, view):
+        guide_type = getattr(view, 'guide_type', None)
+        if guide_type in ('safe_area', 'margins'):
+            return (id(view.superview), guide_type)
+        return id(view)
+
+    def _parent(self, item):
+        if item.guide_type == 'layout':
+            return item.view.view
+        return item.view.superview
+
+    def _pin(self, item):
+        """Holds the item in its current frame, relative to its superview."""
+        solver = self.solver
+        view = item.view
+        superview = view.superview
+        offset_x = Variable(f'{item.left.name}.offset')
+        offset_y = Variable(f'{item.top.name}.offset')
+        x_terms = {item.left: 1.0, offset_x: -1.0}
+        y_terms = {item.top: 1.0, offset_y: -1.0}
+        if superview is not None:
+            parent = self.item(superview)
+            x_terms[parent.left] = -1.0
+            y_terms[parent.top] = -1.0
+        pins = (offset_x, offset_y, Constraint(x_terms), Constraint(y_terms))
+        solver.add_constraint(pins[2])
+        solver.add_constraint(pins[3])
+        frame = tuple(view.frame)
+        for variable, value in zip(
+                (offset_x, offset_y, item.width, item.height), frame):
+            solver.add_edit_variable(variable, STRONG)
+            solver.suggest_value(variable, value)
+        item.pins = pins
+        item.pinned_frame = frame
+        item.pinned_parent = superview
+        self._pinned[self._key(view)] = item
+
+    def _unpin(self, item):
+        solver = self.solver
+        offset_x, offset_y, x_constraint, y_constraint = item.pins
+        for variable in (offset_x, offset_y, item.width, item.height):
+            solver.remove_edit_variable(variable)
+        solver.remove_constraint(x_constraint)
+        solver.remove_constraint(y_constraint)
+        item.pins = item.pinned_frame = item.pinned_parent = None
+        del self._pinned[self._key(item.view)]
+
+    def _inset(self, item, owner):
+        """Ties the safe area or margins pseudo-view to its owner."""
+        if item.guide_type == 'margins':
+            top = left = bottom = right = self.margin
+        else:
+            top, left, bottom, right = self.safe_area_insets
+        add = self.solver.add_constraint
+        add(Constraint({item.left: 1.0, owner.left: -1.0}, -left))
+        add(Constraint({item.top: 1.0, owner.top: -1.0}, -top))
+        add(Constraint(
+            {item.width: 1.0, owner.width: -1.0}, left + right))
+        add(Constraint(
+            {item.height: 1.0, owner.height: -1.0}, top + bottom))
@@ -0,0 +1,157 @@
+# coding: utf-8
+
+"""
+Constraints created from 500 coroutines running on one event loop, with
+`await anchor.apply_async(...)` and `async with anchor.async_batch()`,
+compared with calling `dock` methods directly from the coroutines.
+
+Reports main thread dispatches, and the longest time the event loop was
+unable to run other tasks, e.g. network handlers, as measured by a ticker
+task. The stand-in main thread executor runs the main thread work in the
+event loop thread, the default one in a separate thread.
+
+Before the benchmark, `check` asserts that requests are isolated from
+each other and from constraints created synchronously meanwhile, and
+that cancelled requests create no constraints.
+
+    python benchmarks/bench_async.py
+"""
+
+import asyncio
+import threading
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+import anchor
+
+
+def cards(count):
+    root = anchor.View()
+    views = [anchor.View() for _ in range(count)]
+    for view in views:
+        root.add_subview(view)
+    return views
+
+
+async def direct(view):
+    view.dock.top(share=.1)
+
+
+async def awaited(view):
+    await anchor.apply_async(view.dock.top, share=.1)
+
+
+async def in_async_batch(view):
+    async with anchor.async_batch():
+        view.at.height == 44
+        view.at.width == 100
+
+
+async def ticker(lags, stop):
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0)
+        now = time.perf_counter()
+        lags.append(now - last)
+        last = now
+
+
+async def run(coroutine, views):
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(coroutine(view) for view in views))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await tick
+    return seconds, max(lags)
+
+
+def check():
+    """A failing request discards only its own constraints, even when
+    other constraints are created on the event loop thread while it runs
+    in the executor thread. A cancelled request creates no constraints."""
+    anchor.main_thread_executor = None
+    failing_view, sync_view, other_view = cards(3)
+    started = threading.Event()
+    proceed = threading.Event()
+
+    def failing():
+        failing_view.at.width == 10
+        started.set()
+        proceed.wait(5)
+        raise ValueError('failing request')
+
+    async def scenario():
+        requests = asyncio.gather(
+            anchor.apply_async(failing),
+            anchor.apply_async(lambda: other_view.at.width == 30),
+            return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(
+            None, started.wait, 5)
+        sync_constraint = sync_view.at.height == 20
+        proceed.set()
+        return sync_constraint, await requests
+
+    sync_constraint, (error, other_constraint) = asyncio.run(scenario())
+    assert isinstance(error, ValueError), error
+    assert sync_constraint.objc_constraint is not None
+    assert sync_constraint.objc_constraint.active()
+    assert other_constraint.objc_constraint.active()
+    assert not anchor.find_constraints(failing_view)
+
+    async def in_batch():
+        async with anchor.async_batch():
+            sync_view.at.width == 40
+        return anchor.find_constraints(sync_view, filter=[anchor.At.width])
+
+    assert len(asyncio.run(in_batch())) == 1
+
+    cancelled_view = cards(1)[0]
+    started.clear()
+    proceed.clear()
+
+    def blocking():
+        started.set()
+        proceed.wait(5)
+
+    async def cancelled():
+        blocker = asyncio.ensure_future(anchor.apply_async(blocking))
+        request = asyncio.ensure_future(anchor.apply_async(
+            lambda: cancelled_view.at.width == 50))
+        await asyncio.get_running_loop().run_in_executor(
+            None, started.wait, 5)
+        request.cancel()
+        proceed.set()
+        await blocker
+
+    asyncio.run(cancelled())
+    assert not anchor.find_constraints(cancelled_view)
+
+
+def main(count=500):
+    print(f'{"":<16} {"executor":<10} {"ms":>7} {"dispatches":>11} '
+          f'{"max lag ms":>11}')
+    for coroutine in (direct, awaited, in_async_batch):
+        for name, executor in (
+                ('stand-in', anchor_headless.MainThreadExecutor()),
+                ('thread', None)):
+            if coroutine is direct and executor is None:
+                continue
+            anchor.main_thread_executor = executor
+            views = cards(count)
+            anchor_headless.reset_counters()
+            seconds, lag = asyncio.run(run(coroutine, views))
+            print(f'{coroutine.__name__:<16} {name:<10} '
+                  f'{seconds * 1000:>7.1f} {anchor_headless.dispatches:>11} '
+                  f'{lag * 1000:>11.1f}')
+
+
+if __name__ == '__main__':
+    check()
+    main()
@@ -0,0 +1,46 @@
+# coding: utf-8
+
+"""
+Throughput of attribute access on `view.at`, for plain, padding and layout
+guide attributes, and of creating constraints with `align`.
+
+    python benchmarks/bench_attribute_access.py
+"""
+
+import timeit
+
+import standin
+standin.install()
+
+import anchor
+
+
+def main(number=100000):
+    root = anchor.View()
+    view = anchor.View()
+    other = anchor.View()
+    root.add_subview(view)
+    root.add_subview(other)
+    guide = anchor.Guide(root)
+
+    cases = (
+        ('view.at.top', lambda: view.at.top),
+        ('view.at.center_x', lambda: view.at.center_x),
+        ('view.at.trailing_padding', lambda: view.at.trailing_padding),
+        ('guide.at.width', lambda: guide.at.width),
+        ('view.at.top * 2 + 8', lambda: view.at.top * 2 + 8),
+    )
+    print(f'{"access":<28} {"M/s":>8}')
+    for label, access in cases:
+        seconds = timeit.timeit(access, number=number)
+        print(f'{label:<28} {number / seconds / 1e6:>8.2f}')
+
+    with anchor.batch():
+        seconds = timeit.timeit(
+            lambda: view.align.center_x(other), number=number // 10)
+    print(f'{"view.align.center_x(other)":<28} '
+          f'{number // 10 / seconds / 1e6:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
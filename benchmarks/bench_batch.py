@@ -0,0 +1,72 @@
+# coding: utf-8
+
+"""
+Main thread dispatches and bridge calls when building a form of labeled
+fields, with each constraint activated separately and with the whole form
+in one `anchor.batch()`. In the batch, the only dispatches are the `fit`
+measurement of each label and the activation at the end, which is
+asserted.
+
+    python benchmarks/bench_batch.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor
+
+
+def build_form(rows):
+    root = anchor.View(frame=(0, 0, 400, 20 * rows))
+    previous = None
+    for i in range(rows):
+        label = anchor.Label(text=f'Field {i}')
+        field = anchor.TextField()
+        root.add_subview(label)
+        root.add_subview(field)
+        label.dock.fit()
+        if previous is None:
+            label.dock.top_leading()
+        else:
+            label.at.top == previous.at.bottom_padding
+            label.align.leading(previous)
+        field.at.leading == label.at.trailing_padding
+        field.dock.trailing()
+        field.align.top(label)
+        previous = label
+    return root
+
+
+def measure(rows, batched):
+    standin.reset_counters()
+    start = time.perf_counter()
+    if batched:
+        with anchor.batch():
+            build_form(rows)
+    else:
+        build_form(rows)
+    elapsed = time.perf_counter() - start
+    activations = (standin.calls['setActive_'] +
+                   standin.calls['activateConstraints_'])
+    return (elapsed, standin.dispatches, activations,
+            sum(standin.calls.values()))
+
+
+def main():
+    print(f'{"rows":>6} {"mode":>10} {"ms":>8} {"dispatches":>11} '
+          f'{"activations":>12} {"bridge calls":>13}')
+    for rows in (10, 100, 200):
+        for batched in (False, True):
+            elapsed, dispatches, activations, bridge_calls = measure(
+                rows, batched)
+            if batched:
+                assert dispatches == rows + 1, dispatches
+            print(f'{rows:>6} {"batch" if batched else "separate":>10} '
+                  f'{elapsed * 1000:>8.2f} {dispatches:>11} '
+                  f'{activations:>12} {bridge_calls:>13}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# coding: utf-8
+
+"""
+Constant edits per second on a layout of about 300 constraints with the
+solver backend, like `LayoutDemo.layout` flipping the leading constant of
+the main frame. Compares updating the constant in place with removing and
+adding the constraint.
+
+    python benchmarks/bench_constant_edits.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor
+import anchor_solver
+
+
+def build(rows=40):
+    root = anchor.View(frame=(0, 0, 1024, 768), name='root')
+    side_panel = anchor.View(name='side panel')
+    main_frame = anchor.View(name='main frame')
+    root.add_subview(side_panel)
+    root.add_subview(main_frame)
+    main_frame.dock.vertical(fit=anchor.Dock.SAFE)
+    main_frame.at.trailing == root.at.safe_area.trailing
+    main_leading = main_frame.at.leading == root.at.safe_area.leading
+    side_panel.dock.leading(fit=anchor.Dock.SAFE)
+    side_panel.at.width == 300
+    previous = None
+    for i in range(rows):
+        label = anchor.Label(name=f'label{i}')
+        value = anchor.View(name=f'value{i}')
+        main_frame.add_subview(label)
+        main_frame.add_subview(value)
+        if previous is None:
+            label.dock.top_leading()
+        else:
+            label.at.top == previous.at.bottom_padding
+            label.align.leading(previous)
+        label.at.height == 20
+        label.at.width == 100
+        value.at.leading == label.at.trailing_padding
+        value.at.trailing == main_frame.at.trailing_margin
+        value.align.top(label)
+        previous = label
+    return root, main_leading
+
+
+def main(edits=10000):
+    backend = anchor.backend = anchor_solver.SolverBackend()
+    root, main_leading = build()
+    backend.layout(root)
+    print(f'constraints: {len(backend.solver._constraints)}')
+
+    last_label = root.subviews[1].subviews[-2]
+
+    start = time.perf_counter()
+    for i in range(edits):
+        main_leading.constant = 300 * (i % 2)
+    elapsed = time.perf_counter() - start
+    print(f'in place:       {edits / elapsed:>9.0f} edits/s')
+
+    start = time.perf_counter()
+    for i in range(edits):
+        main_leading.constant = 300 * (i % 2)
+        backend.frame(last_label)
+    elapsed = time.perf_counter() - start
+    print(f'in place+frame: {edits / elapsed:>9.0f} edits/s')
+
+    handle = main_leading.objc_constraint
+    solver = backend.solver
+    start = time.perf_counter()
+    for i in range(edits // 10):
+        solver.remove_constraint(handle.constraint)
+        handle.constraint.constant = -300 * (i % 2)
+        solver.add_constraint(handle.constraint)
+    elapsed = time.perf_counter() - start
+    print(f'remove and add: {edits // 10 / elapsed:>9.0f} edits/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# coding: utf-8
+
+"""
+Creating 50k constraints from data with `constrain_many`, compared with
+the same constraints written as `at` expressions, and the time it takes
+to reject a spec list with invalid rows. Garbage from the previous run is
+collected before each measurement, as collecting the 50k constraints of
+one run in the middle of the next would be timed as part of it.
+
+    python benchmarks/bench_constrain_many.py
+"""
+
+import gc
+import random
+import time
+
+import standin
+standin.install()
+
+import anchor
+
+ATTRIBUTES = ('top', 'bottom', 'leading', 'trailing', 'width', 'height',
+              'center_x', 'center_y')
+COMPATIBLE = {
+    'top': ('top', 'bottom', 'center_y'),
+    'bottom': ('top', 'bottom', 'center_y'),
+    'leading': ('leading', 'trailing'),
+    'trailing': ('leading', 'trailing'),
+    'width': ('width', 'height'),
+    'height': ('width', 'height'),
+    'center_x': ('center_x', 'leading', 'trailing'),
+    'center_y': ('center_y', 'top', 'bottom'),
+}
+
+
+def specs(count, view_count, seed=0):
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        attribute = rng.choice(ATTRIBUTES)
+        if attribute in ('width', 'height') and rng.random() < .5:
+            result.append(
+                (rng.randrange(view_count), attribute, 0, None, None,
+                 1, rng.randrange(20, 100)))
+        else:
+            result.append(
+                (rng.randrange(view_count), attribute, rng.choice((-1, 0, 1)),
+                 rng.randrange(view_count),
+                 rng.choice(COMPATIBLE[attribute]),
+                 1, rng.randrange(-20, 20), rng.choice((250, 750, 1000))))
+    return result
+
+
+def views(count):
+    root = anchor.View()
+    result = [anchor.View() for _ in range(count)]
+    for view in result:
+        root.add_subview(view)
+    return result
+
+
+def with_expressions(views, specs):
+    operators = {
+        -1: lambda a, b: a <= b, 0: lambda a, b: a == b,
+        1: lambda a, b: a >= b}
+    with anchor.batch():
+        for spec in specs:
+            (index, attribute, relation, other_index, other_attribute,
+             multiplier, constant) = spec[:7]
+            priority = spec[7] if len(spec) > 7 else 1000
+            at = getattr(views[index].at.priority(priority), attribute)
+            if other_index is None:
+                other = constant
+            else:
+                other = getattr(
+                    views[other_index].at, other_attribute) * multiplier + \
+                    constant
+            operators[relation](at, other)
+
+
+class NoActivation:
+    """Backend that leaves the constraints inactive, to time creating and
+    checking them on their own."""
+
+    def activate(self, constraints):
+        pass
+
+
+def main(count=50000, view_count=1000):
+    data = specs(count, view_count)
+    uikit = anchor.backend
+
+    print(f'{"":<24} {"ms":>8} {"specs/s":>10}')
+    for backend, suffix in ((NoActivation(), ''), (uikit, ' + activate')):
+        anchor.backend = backend
+        for label, create in (
+                ('at expressions', with_expressions),
+                ('constrain_many', anchor.constrain_many)):
+            targets = None
+            targets = views(view_count)
+            gc.collect()
+            start = time.perf_counter()
+            create(targets, data)
+            seconds = time.perf_counter() - start
+            print(f'{label + suffix:<24} {seconds * 1000:>8.1f} '
+                  f'{count / seconds:>10.0f}')
+    anchor.backend = uikit
+
+    targets = None
+    targets = views(view_count)
+    gc.collect()
+    broken = list(data)
+    for row in range(0, count, 100):
+        broken[row] = (0, 'top', 0, 1, 'width')
+    start = time.perf_counter()
+    try:
+        anchor.constrain_many(targets, broken)
+    except TypeError as error:
+        reported = len(str(error).splitlines()) - 1
+    seconds = time.perf_counter() - start
+    print(f'{"reject, 1% invalid":<24} {seconds * 1000:>8.1f} '
+          f'{count / seconds:>10.0f}   {reported} rows reported')
+
+
+if __name__ == '__main__':
+    main()
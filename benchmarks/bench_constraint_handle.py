@@ -0,0 +1,49 @@
+# coding: utf-8
+
+"""
+Cost of accessing the NSLayoutConstraint of an `At` object as the view
+hierarchy grows deeper, compared with searching the hierarchy by
+description.
+
+    python benchmarks/bench_constraint_handle.py
+"""
+
+import timeit
+
+import standin
+standin.install()
+
+import anchor
+
+
+def nested_views(depth):
+    """Returns a constraint of the deepest view that is installed on the
+    root view."""
+    root = anchor.View(name='root')
+    view = root
+    deepest_constraint = None
+    for _ in range(depth):
+        subview = anchor.View()
+        view.add_subview(subview)
+        subview.dock.all(fit=anchor.Dock.TIGHT)
+        deepest_constraint = subview.at.top >= root.at.top
+        view = subview
+    return deepest_constraint
+
+
+def main(number=2000):
+    print(f'{"depth":>6} {"handle µs":>10} {"search µs":>10}')
+    for depth in (1, 5, 10, 20, 40, 80):
+        constraint = nested_views(depth)
+        handle = timeit.timeit(
+            lambda: constraint.objc_constraint, number=number)
+        search = timeit.timeit(
+            lambda: anchor.find_constraint(
+                constraint.view, constraint.description),
+            number=number // 10) * 10
+        print(f'{depth:>6} {handle / number * 1e6:>10.2f} '
+              f'{search / number * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
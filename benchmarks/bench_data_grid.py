@@ -0,0 +1,96 @@
+# coding: utf-8
+
+"""
+DataGridView with 100k logical cells in a scrolling dashboard: views
+created, time of the first layout and per scroll step, and memory, compared
+with a plain GridView that has a view for every cell.
+
+    python benchmarks/bench_data_grid.py
+"""
+
+import time
+import tracemalloc
+
+import standin
+standin.install()
+
+import anchor
+
+
+class Readings:
+    """Data source with a label per sensor reading."""
+
+    def __init__(self, count):
+        self.count = count
+        self.created = 0
+
+    def gridview_number_of_cells(self, gridview):
+        return self.count
+
+    def gridview_cell_for_index(self, gridview, index, cell):
+        if cell is None:
+            cell = standin.Label()
+            self.created += 1
+        cell.text = f'{index}: {index * 0.1:.1f}'
+        return cell
+
+
+def scrolling_grid(count, count_x=20, width=1024, height=768):
+    scroll_view = standin.ScrollView(frame=(0, 0, width, height))
+    source = Readings(count)
+    grid = anchor.DataGridView(source, count_x=count_x)
+    step = (width - 8) / count_x
+    grid_height = -(-count // count_x) * step + 8
+    grid.frame = (0, 0, width, grid_height)
+    scroll_view.content_size = (width, grid_height)
+    scroll_view.add_subview(grid)
+    scroll_view.delegate = grid
+    return scroll_view, grid, source
+
+
+def data_grid(count, steps=500):
+    tracemalloc.start()
+    start = time.perf_counter()
+    scroll_view, grid, source = scrolling_grid(count)
+    grid.layout()
+    first = time.perf_counter() - start
+
+    scroll_height = grid.height - scroll_view.height
+    start = time.perf_counter()
+    for step in range(steps):
+        scroll_view.scroll_to(0, scroll_height * step / steps)
+    scrolling = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{"DataGridView":<14} {count:>7} {source.created:>7} '
+          f'{first * 1000:>10.1f} {scrolling / steps * 1000:>10.3f} '
+          f'{peak / 1024:>10.0f}')
+
+
+def plain_grid(count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    scroll_view, grid, _ = scrolling_grid(count)
+    plain = anchor.GridView(count_x=20)
+    plain.frame = grid.frame
+    for _ in range(count):
+        plain.add_subview(standin.Label())
+    plain.layout()
+    first = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{"GridView":<14} {count:>7} {count:>7} '
+          f'{first * 1000:>10.1f} {"-":>10} {peak / 1024:>10.0f}')
+
+
+def main():
+    print(f'{"":<14} {"cells":>7} {"views":>7} {"layout ms":>10} '
+          f'{"scroll ms":>10} {"peak KiB":>10}')
+    for count in (1000, 10000):
+        plain_grid(count)
+    for count in (1000, 10000, 100000):
+        data_grid(count)
+
+
+if __name__ == '__main__':
+    main()
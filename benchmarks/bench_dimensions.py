@@ -0,0 +1,71 @@
+# coding: utf-8
+
+"""
+Bridge calls and time of the `Dimensions` checks a root view makes in
+every layout pass, when the traits are cached, compared with reading them
+from the key window on every call as before. The screen is rotated every
+100 passes.
+
+    python benchmarks/bench_dimensions.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+from anchor import Dimensions
+
+PORTRAIT = (390.0, 844.0)
+LANDSCAPE = (844.0, 390.0)
+
+
+def layout_pass():
+    Dimensions.is_width_constrained()
+    Dimensions.is_height_constrained()
+    Dimensions.is_pad()
+
+
+def uncached_layout_pass():
+    Dimensions._screen_size = None
+    Dimensions.is_width_constrained()
+    Dimensions._screen_size = None
+    Dimensions.is_height_constrained()
+    Dimensions._screen_size = None
+    Dimensions.is_pad()
+
+
+def run(func, passes):
+    rotations = []
+
+    @Dimensions.subscribe
+    def changed():
+        rotations.append(Dimensions.screen_size())
+
+    anchor_headless.reset_counters()
+    start = time.perf_counter()
+    for i in range(passes):
+        if i % 100 == 0:
+            anchor_headless.screen_size = (
+                LANDSCAPE if i // 100 % 2 else PORTRAIT)
+        func()
+    seconds = time.perf_counter() - start
+    Dimensions.unsubscribe(changed)
+    return seconds, sum(anchor_headless.calls.values()), len(rotations)
+
+
+def main(passes=10000):
+    anchor_headless.interface_idiom = 0
+    print(f'{"":<10} {"µs/pass":>8} {"calls":>7} {"notified":>9}')
+    for name, func in (('cached', layout_pass),
+                       ('uncached', uncached_layout_pass)):
+        seconds, calls, rotations = run(func, passes)
+        if func is uncached_layout_pass:
+            rotations = '-'
+        print(f'{name:<10} {seconds / passes * 1e6:>8.2f} {calls:>7} '
+              f'{rotations:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# coding: utf-8
+
+"""
+Main thread dispatches and bridge calls of `Dock.between`, `Dock.all` and
+`Align.center` over 50 views. Every call should be a single main thread
+transaction, with no bridge calls made outside of it.
+
+    python benchmarks/bench_dock_dispatch.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+import anchor
+
+
+def between(root, views):
+    previous = None
+    for view in views:
+        view.dock.between(top=previous)
+        previous = view
+
+
+def dock_all(root, views):
+    for view in views:
+        view.dock.all(fit=anchor.Dock.SAFE)
+
+
+def align_center(root, views):
+    root.align.center(*views)
+
+
+def main(count=50):
+    print(f'{"operation":<14} {"ms":>6} {"dispatches":>11} {"calls":>6} '
+          f'{"off main":>9}')
+    for func in (between, dock_all, align_center):
+        root = anchor.View()
+        views = [anchor.View() for _ in range(count)]
+        for view in views:
+            root.add_subview(view)
+        anchor_headless.reset_counters()
+        start = time.perf_counter()
+        func(root, views)
+        seconds = time.perf_counter() - start
+        print(f'{func.__name__:<14} {seconds * 1000:>6.2f} '
+              f'{anchor_headless.dispatches:>11} '
+              f'{sum(anchor_headless.calls.values()):>6} '
+              f'{sum(anchor_headless.off_main_thread.values()):>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# coding: utf-8
+
+"""
+Cost of `enable` on a view that is already enabled, and the accessor
+objects (`At`, `Dock`, `Align`) created while building the demo layout of
+anchor.py.
+
+    python benchmarks/bench_enable.py
+"""
+
+import timeit
+from collections import Counter
+
+import standin
+standin.install()
+
+import anchor
+from bench_memory import demo_layout
+
+created = Counter()
+
+
+def counting(cls):
+    init = cls.__init__
+
+    def __init__(self, *args, **kwargs):
+        created[cls.__name__] += 1
+        init(self, *args, **kwargs)
+
+    cls.__init__ = __init__
+
+
+def main(number=100000, demos=200):
+    view = anchor.enable(anchor.View())
+    seconds = timeit.timeit(lambda: anchor.enable(view), number=number)
+    print(f'enable, already enabled: {seconds / number * 1e6:.3f} µs')
+
+    seconds = min(timeit.repeat(demo_layout, number=demos, repeat=3))
+    print(f'demo layout:             {seconds / demos * 1000:.3f} ms')
+
+    for cls in (anchor.Dock, anchor.Align):
+        counting(cls)
+    demo_layout()
+    print('accessors per demo:      ' + ', '.join(
+        f'{name} {count}' for name, count in sorted(created.items())))
+
+
+if __name__ == '__main__':
+    main()
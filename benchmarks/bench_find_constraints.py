@@ -0,0 +1,101 @@
+# coding: utf-8
+
+"""
+find_constraints on a hierarchy with 2,000 constraints, from anchor's
+constraint index, compared with searching the constraints of the view and
+its superviews over the bridge, as find_constraints used to.
+
+    python benchmarks/bench_find_constraints.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor
+from anchor import At
+
+
+def search_constraints(view, first=True, second=False, filter=None):
+    """The previous implementation."""
+    objc_view = view.objc_instance
+    codes = [attribute.code for attribute in filter or ()]
+    constraints = []
+    while view:
+        for c in view.objc_instance.constraints():
+            if (
+                    (first and c.firstItem() == objc_view) or
+                    (second and c.secondItem() == objc_view)
+            ) and c.active() and (
+                    not codes or c.firstAttribute() in codes):
+                constraints.append(c)
+        view = view.superview
+    return constraints
+
+
+def hierarchy(panels=10, rows=50):
+    """Panels of stacked rows, 4 constraints per row."""
+    root = anchor.View(name='root')
+    rows_by_panel = []
+    with anchor.batch():
+        previous_panel = None
+        for _ in range(panels):
+            panel = anchor.View()
+            root.add_subview(panel)
+            panel_rows = []
+            previous = None
+            for _ in range(rows):
+                row = anchor.View()
+                panel.add_subview(row)
+                row.at.leading == panel.at.leading
+                row.at.trailing == panel.at.trailing
+                row.at.height == 20
+                if previous is None:
+                    row.at.top == panel.at.top
+                else:
+                    row.at.top == previous.at.bottom
+                previous = row
+                panel_rows.append(row)
+            rows_by_panel.append(panel_rows)
+    return root, [row for rows in rows_by_panel for row in rows]
+
+
+def timed(find, views, **kwargs):
+    standin.reset_counters()
+    start = time.perf_counter()
+    found = sum(len(find(view, **kwargs)) for view in views)
+    seconds = time.perf_counter() - start
+    return seconds / len(views), sum(standin.calls.values()) / len(views), \
+        found
+
+
+def main():
+    root, rows = hierarchy()
+    count = len(standin.active_constraints(root))
+    print(f'constraints: {count}\n')
+    print(f'{"query":<26} {"":<8} {"µs":>9} {"calls":>8} {"found":>6}')
+    queries = (
+        ('all, first item', {}),
+        ('top, first item', {'filter': [At.top]}),
+        ('all, first or second', {'second': True}),
+    )
+    for label, kwargs in queries:
+        for name, find in (
+                ('search', search_constraints),
+                ('index', anchor.find_constraints)):
+            seconds, calls, found = timed(find, rows, **kwargs)
+            print(f'{label:<26} {name:<8} {seconds * 1e6:>9.2f} '
+                  f'{calls:>8.1f} {found:>6}')
+
+    for row in rows[::10]:
+        row.superview.remove_subview(row)
+    remaining = [row for row in rows if row.superview is not None]
+    _, _, found = timed(anchor.find_constraints, remaining, second=True)
+    _, _, expected = timed(search_constraints, remaining, second=True)
+    print(f'\nafter removing every 10th row: index finds {found}, '
+          f'search finds {expected}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# coding: utf-8
+
+"""
+Fitting 1,000 labels with `anchor.fit(*labels)`, which measures all of
+them in one main thread call and reuses the measurements of labels with
+the same text and font, compared with fitting the labels one by one
+without reusing measurements.
+
+    python benchmarks/bench_fit.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+import anchor
+
+
+def labels(count, distinct):
+    root = anchor.View()
+    views = []
+    for i in range(count):
+        label = anchor.Label(text=f'Reading {i % distinct}')
+        root.add_subview(label)
+        views.append(label)
+    return views
+
+
+def one_by_one(views):
+    for view in views:
+        anchor.fitted_sizes.clear()
+        anchor.fit(view)
+
+
+def together(views):
+    anchor.fit(*views)
+
+
+def main(count=1000):
+    print(f'{"":<12} {"texts":>6} {"ms":>8} {"measured":>9} {"calls":>7} '
+          f'{"dispatches":>11}')
+    for name, func in (('one by one', one_by_one), ('fit(*views)', together)):
+        for distinct in (count, 20):
+            views = labels(count, distinct)
+            anchor.fitted_sizes.clear()
+            anchor_headless.reset_counters()
+            start = time.perf_counter()
+            func(views)
+            seconds = time.perf_counter() - start
+            calls = anchor_headless.calls
+            print(f'{name:<12} {distinct:>6} {seconds * 1000:>8.1f} '
+                  f'{calls["sizeThatFits_"]:>9} {sum(calls.values()):>7} '
+                  f'{anchor_headless.dispatches:>11}')
+
+
+if __name__ == '__main__':
+    main()
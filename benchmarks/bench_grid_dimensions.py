@@ -0,0 +1,109 @@
+# coding: utf-8
+
+"""
+Time per `grid_dimensions` call, cold and from the memo table, and the
+cell size it gains over the previous sqrt rounding, which ignored gaps and
+borders.
+
+Before the benchmark, `check` asserts that `grid_dimensions` finds the
+same grid as a search over every column count, on 20,000 random grids
+of up to 499 cells, including empty grids.
+
+    python benchmarks/bench_grid_dimensions.py
+"""
+
+import math
+import random
+import timeit
+
+import standin
+standin.install()
+
+import anchor
+
+
+def sqrt_rounding(count, width, height):
+    """The previous GridView.dimensions."""
+    if height == 0:
+        return 1, count
+    count_x = math.sqrt(count * width / height)
+    count_y = math.sqrt(count * height / width)
+    best = None
+    for round_x in (math.floor, math.ceil):
+        for round_y in (math.floor, math.ceil):
+            x, y = round_x(count_x), round_y(count_y)
+            diff = x * y - count
+            if diff >= 0 and (best is None or diff < best[0]):
+                best = (diff, x, y)
+    return best[1], best[2]
+
+
+def cell_size(count_x, count_y, width, height, gap, border_width):
+    return min(
+        (width - 2 * border_width - (count_x + 1) * gap) / count_x,
+        (height - 2 * border_width - (count_y + 1) * gap) / count_y)
+
+
+def brute_force(count, width, height, gap, border_width):
+    """The best grid found by trying every column count, with as few rows
+    as the count of columns allows."""
+    a = width - 2 * border_width - gap
+    b = height - 2 * border_width - gap
+    return max(
+        ((n, math.ceil(count / n)) for n in range(1, count + 1)),
+        key=lambda c: (min(a / c[0], b / c[1]), -(c[0] * c[1]), -c[0]),
+        default=(0, 0))
+
+
+def check(grids=20000):
+    rng = random.Random(1)
+    for _ in range(grids):
+        count = rng.randrange(0, 500)
+        width, height = rng.uniform(50, 2000), rng.uniform(50, 2000)
+        gap, border_width = rng.choice((0, 8)), rng.choice((0, 2))
+        anchor.grid_dimensions.cache_clear()
+        found = anchor.grid_dimensions(
+            count, width, height, gap, border_width)
+        expected = brute_force(count, width, height, gap, border_width)
+        assert found == expected, (
+            count, width, height, gap, border_width, found, expected)
+
+
+def main(number=2000, samples=2000):
+    width, height, gap, border_width = 1024, 768, 8, 2
+    print(f'{"cells":>6} {"sqrt µs":>9} {"cold µs":>9} {"memo µs":>9}')
+    for count in (10, 100, 1000, 10000, 50000):
+        old = timeit.timeit(
+            lambda: sqrt_rounding(count, width, height), number=number)
+
+        def cold():
+            anchor.grid_dimensions.cache_clear()
+            anchor.grid_dimensions(count, width, height, gap, border_width)
+        new = timeit.timeit(cold, number=number)
+        memo = timeit.timeit(
+            lambda: anchor.grid_dimensions(
+                count, width, height, gap, border_width), number=number)
+        print(f'{count:>6} {old / number * 1e6:>9.2f} '
+              f'{new / number * 1e6:>9.2f} {memo / number * 1e6:>9.2f}')
+
+    rng = random.Random(0)
+    gains = []
+    for _ in range(samples):
+        count = rng.randrange(1, 200)
+        width, height = rng.uniform(200, 1400), rng.uniform(200, 1400)
+        before = cell_size(
+            *sqrt_rounding(count, width, height),
+            width, height, gap, border_width)
+        after = cell_size(
+            *anchor.grid_dimensions(count, width, height, gap, border_width),
+            width, height, gap, border_width)
+        gains.append(after / before - 1)
+    improved = sum(1 for gain in gains if gain > 1e-9)
+    print(f'\n{samples} random grids of 1-200 cells: larger cells in '
+          f'{improved}, on average {sum(gains) / len(gains):.1%}, '
+          f'at most {max(gains):.1%}')
+
+
+if __name__ == '__main__':
+    check()
+    main()
@@ -0,0 +1,68 @@
+# coding: utf-8
+
+"""
+Frame assignments and time per GridView resize sweep. A sweep rotates
+the grid between portrait and landscape, and then resizes it live through
+a range of widths, with several layout passes per size like UIKit does
+during animations.
+
+    python benchmarks/bench_grid_layout.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor
+
+
+class Cell(standin.View):
+
+    assignments = 0
+
+    @property
+    def frame(self):
+        return self._frame
+
+    @frame.setter
+    def frame(self, value):
+        Cell.assignments += 1
+        self._frame = tuple(value)
+
+
+def sizes():
+    for _ in range(5):
+        yield 1024, 768
+        yield 768, 1024
+    for width in range(400, 800, 10):
+        yield width, 600
+    for width in range(800, 400, -10):
+        yield width, 600
+
+
+def sweep(grid, passes=3):
+    for width, height in sizes():
+        grid.frame = (0, 0, width, height)
+        for _ in range(passes):
+            grid.layout()
+
+
+def main(sweeps=5):
+    print(f'{"cells":>6} {"pack":>6} {"assignments":>12} {"ms":>8}')
+    for count in (10, 100, 1000):
+        for pack in (anchor.GridView.CENTER, anchor.GridView.FILL):
+            grid = anchor.GridView(pack=pack)
+            for _ in range(count):
+                grid.add_subview(Cell())
+            Cell.assignments = 0
+            start = time.perf_counter()
+            for _ in range(sweeps):
+                sweep(grid)
+            seconds = time.perf_counter() - start
+            print(f'{count:>6} {pack:>6} {Cell.assignments // sweeps:>12} '
+                  f'{seconds / sweeps * 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
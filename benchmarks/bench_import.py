@@ -0,0 +1,80 @@
+# coding: utf-8
+
+"""
+Time to import anchor in a fresh interpreter, with the enabled view classes
+and ObjC classes created on first use, compared with creating all of them
+at import as anchor used to. The stand-ins are imported before the timer
+starts, and `ObjCClass` lookups are made to take `--lookup-ms`, as
+resolving a class over the ObjC bridge is not free on a device.
+
+    python benchmarks/bench_import.py
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPT = '''
+import sys, time
+sys.path.insert(0, {benchmarks!r})
+import standin
+standin.install()
+import objc_util
+lookup = objc_util.ObjCClass
+def ObjCClass(name, _lookup=lookup):
+    end = time.perf_counter() + {lookup_ms} / 1000
+    while time.perf_counter() < end:
+        pass
+    return _lookup(name)
+objc_util.ObjCClass = ObjCClass
+
+start = time.perf_counter()
+import anchor
+{after}
+print(time.perf_counter() - start)
+'''
+
+EAGER = '''
+for name in anchor.OBJC_CLASSES:
+    getattr(anchor, name)
+exec('from anchor import *', {})
+'''
+
+FIRST_USE = '''
+anchor.enable(anchor.ui.View())
+'''
+
+
+def run(after, lookup_ms, repeat):
+    benchmarks = os.path.dirname(os.path.abspath(__file__))
+    code = SCRIPT.format(
+        benchmarks=benchmarks, lookup_ms=lookup_ms, after=after)
+    # Time a cached import, not compiling anchor.py
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    times = [
+        float(subprocess.check_output(
+            [sys.executable, '-c', code], env=env))
+        for _ in range(repeat + 1)]
+    return statistics.median(times[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lookup-ms', type=float, default=2.0)
+    parser.add_argument('--repeat', type=int, default=15)
+    args = parser.parse_args()
+
+    print(f'{"":<34} {"ms":>8}')
+    for label, after in (
+            ('import anchor', ''),
+            ('import, enable() one view', FIRST_USE),
+            ('import, create everything (eager)', EAGER)):
+        seconds = run(after, args.lookup_ms, args.repeat)
+        print(f'{label:<34} {seconds * 1000:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
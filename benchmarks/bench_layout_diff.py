@@ -0,0 +1,85 @@
+# coding: utf-8
+
+"""
+Bridge calls when a 1,000-cell, 4,000-constraint layout changes, with
+`Layout.update` applying only the difference, compared with removing and
+recreating every constraint. Changes are either new constants, or cells
+whose width constraint is replaced with a different kind of constraint.
+The diff reads `active` once per kept constraint, and changes on top of
+that.
+
+    python benchmarks/bench_layout_diff.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor
+
+
+def cell_constraints(root, cells, widths, linked, columns=40):
+    for i, (cell, width) in enumerate(zip(cells, widths)):
+        row, column = divmod(i, columns)
+        cell.at.leading == root.at.leading + column * 24
+        cell.at.top == root.at.top + row * 24
+        if i in linked:
+            cell.at.width == cells[i - 1].at.width
+        else:
+            cell.at.width == width
+        cell.at.height == 20
+
+
+def rebuild(root, cells, widths, linked):
+    anchor.remove_constraints(cells)
+    with anchor.batch():
+        cell_constraints(root, cells, widths, linked)
+
+
+def measure(func, *args):
+    standin.reset_counters()
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start, sum(standin.calls.values())
+
+
+def main(count=1000):
+    root = anchor.View()
+    cells = [anchor.View() for _ in range(count)]
+    for cell in cells:
+        root.add_subview(cell)
+    widths = [20] * count
+    layout = anchor.Layout(cell_constraints)
+    layout.update(root, cells, widths, set())
+    with anchor.batch():
+        pass
+
+    print(f'{"change":<10} {"cells":>6} {"diff ms":>9} {"calls":>7} '
+          f'{"rebuild ms":>11} {"calls":>7}')
+    for kind in ('constant', 'structure'):
+        for changed in (0, 1, 10, 100, 1000):
+            step = count // changed if changed else count + 1
+            indexes = set(range(1, count, step)) if changed else set()
+            if kind == 'constant':
+                new_widths = [
+                    21 if i in indexes else 20 for i in range(count)]
+                linked = set()
+            else:
+                new_widths = widths
+                linked = indexes
+            diff_time, diff_calls = measure(
+                layout.update, root, cells, new_widths, linked)
+            layout.update(root, cells, widths, set())
+            rebuild_time, rebuild_calls = measure(
+                rebuild, root, cells, new_widths, linked)
+            anchor.remove_constraints(cells)
+            layout.constraints = []
+            layout.update(root, cells, widths, set())
+            print(f'{kind:<10} {len(indexes):>6} {diff_time * 1000:>9.1f} '
+                  f'{diff_calls:>7} {rebuild_time * 1000:>11.1f} '
+                  f'{rebuild_calls:>7}')
+
+
+if __name__ == '__main__':
+    main()
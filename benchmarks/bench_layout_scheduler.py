@@ -0,0 +1,69 @@
+# coding: utf-8
+
+"""
+Adding cells one at a time to a GridView. Laying the grid out after every
+addition, as dashboard.py does, costs O(N²); with the layout scheduler,
+the grid is laid out once on the next turn of the run loop, or at the end
+of a batch, and the cost per cell stays flat.
+
+    python benchmarks/bench_layout_scheduler.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+import anchor
+
+
+class EagerGridView(anchor.GridView):
+
+    def add_subview(self, subview):
+        anchor.ui.View.add_subview(self, subview)
+        self.layout()
+
+
+def add_cells(grid, count):
+    for _ in range(count):
+        grid.add_subview(anchor.View())
+
+
+def eager(count):
+    add_cells(EagerGridView(frame=(0, 0, 1024, 768)), count)
+
+
+def next_turn(count):
+    add_cells(anchor.GridView(frame=(0, 0, 1024, 768)), count)
+    anchor_headless.run_delayed()
+
+
+def in_batch(count):
+    with anchor.batch():
+        add_cells(anchor.GridView(frame=(0, 0, 1024, 768)), count)
+
+
+def main():
+    layouts = []
+    layout = anchor.GridView.layout
+
+    def counted_layout(self):
+        layouts.append(self)
+        layout(self)
+
+    anchor.GridView.layout = counted_layout
+
+    print(f'{"":<10} {"cells":>6} {"ms":>8} {"µs/cell":>8} {"layouts":>8}')
+    for func in (eager, next_turn, in_batch):
+        for count in (125, 250, 500, 1000):
+            layouts.clear()
+            start = time.perf_counter()
+            func(count)
+            seconds = time.perf_counter() - start
+            print(f'{func.__name__:<10} {count:>6} {seconds * 1000:>8.1f} '
+                  f'{seconds / count * 1e6:>8.1f} {len(layouts):>8}')
+
+
+if __name__ == '__main__':
+    main()
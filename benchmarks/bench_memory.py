@@ -0,0 +1,95 @@
+# coding: utf-8
+
+"""
+Memory use and allocation churn of building the demo layout of anchor.py
+1,000 times, measured with tracemalloc.
+
+    python benchmarks/bench_memory.py
+"""
+
+import sys
+import time
+import tracemalloc
+
+import standin
+standin.install()
+
+import anchor
+from anchor import Button, Dock, GridView, Label, TextField, View
+
+
+def demo_layout():
+    """The layout of `LayoutDemo.create_ui` in anchor.py."""
+    root = View()
+    anchor.enable(root)
+
+    main_frame = View(name='Main frame')
+    root.add_subview(main_frame)
+    side_panel = Label(name='Side panel', text='Side navigation panel')
+    root.add_subview(side_panel)
+
+    main_frame.dock.all(fit=Dock.SAFE)
+    root.main_leading = main_frame.at.leading == root.at.safe_area.leading
+    side_panel.dock.leading(fit=Dock.SAFE)
+    side_panel.at.width == 300
+    side_panel.align.height(main_frame)
+    side_panel.at.trailing == main_frame.at.leading
+
+    search_field = TextField(name='Searchfield', placeholder='Search path')
+    main_frame.add_subview(search_field)
+    search_button = Button(name='Search', title='Search').dock.fit()
+    main_frame.add_subview(search_button)
+    result_area = GridView(name='Result area', pack=GridView.SPREAD)
+    main_frame.add_subview(result_area)
+    done_button = Button(name='Done', title='Done').dock.fit()
+    main_frame.add_subview(done_button)
+    cancel_button = Button(name='Cancel', title='Cancel').dock.fit()
+    main_frame.add_subview(cancel_button)
+
+    search_field.dock.top_leading()
+    search_button.dock.top_trailing()
+    search_field.at.trailing == search_button.at.leading_padding
+    search_field.align.height(search_button)
+    done_button.dock.bottom_trailing()
+    cancel_button.at.trailing == done_button.at.leading_padding
+    cancel_button.align.top(done_button)
+    result_area.dock.between(top=search_button, bottom=done_button)
+    for _ in range(5):
+        result_area.add_subview(View())
+    return root
+
+
+def object_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main(count=1000):
+    view = anchor.View()
+    builder = view.at.left
+    record = view.at.width == 100
+    print(f'At builder:        {object_size(builder):>6} bytes')
+    print(f'Constraint record: {object_size(record):>6} bytes')
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    roots = [demo_layout() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{count} demo layouts:  {elapsed * 1000:>6.0f} ms, '
+          f'retained {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB')
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    for _ in range(10000):
+        view.at.top_padding
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'10000 padding attribute accesses: peak {peak} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# coding: utf-8
+
+"""
+Tearing down and rebuilding the constraints of a 1,000-cell layout, with
+remove_constraints deactivating everything in one call, compared with
+deactivating the constraints of one view at a time.
+
+    python benchmarks/bench_remove_constraints.py
+"""
+
+import time
+
+import standin
+from standin import on_main_thread
+standin.install()
+
+import anchor
+
+
+@on_main_thread
+def remove_one_view(view):
+    """Removal a view at a time, each constraint separately."""
+    for constraint, objc_constraint in anchor._find_constraints(view).items():
+        objc_constraint.setActive_(False)
+        anchor._unregister(constraint)
+
+
+def remove_one_at_a_time(cells):
+    for cell in cells:
+        remove_one_view(cell)
+
+
+def remove_together(cells):
+    anchor.remove_constraints(cells)
+
+
+def build(root, cells, columns=40):
+    with anchor.batch():
+        for i, cell in enumerate(cells):
+            row, column = divmod(i, columns)
+            left = cells[i - 1] if column else None
+            above = cells[i - columns] if row else None
+            cell.at.leading == (
+                left.at.trailing + 2 if left else root.at.leading)
+            cell.at.top == (above.at.bottom + 2 if above else root.at.top)
+            cell.at.width == 20
+            cell.at.height == 20
+
+
+def measure(func, *args):
+    standin.reset_counters()
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start, standin.dispatches,
+            sum(standin.calls.values()))
+
+
+def main(count=1000, rounds=5):
+    root = anchor.View()
+    cells = [anchor.View() for _ in range(count)]
+    for cell in cells:
+        root.add_subview(cell)
+    build(root, cells)
+    print(f'constraints: {len(standin.active_constraints(root))}\n')
+
+    print(f'{"":<24} {"ms":>8} {"dispatches":>11} {"calls":>8}')
+    rebuilds = []
+    for label, remove in (
+            ('one view at a time', remove_one_at_a_time),
+            ('remove_constraints', remove_together)):
+        removals = []
+        for _ in range(rounds):
+            removals.append(measure(remove, cells))
+            assert not standin.active_constraints(root)
+            rebuilds.append(measure(build, root, cells))
+        report(label, removals)
+    report('rebuild', rebuilds)
+
+
+def report(label, measurements):
+    seconds, dispatches, calls = (
+        sum(values) / len(measurements) for values in zip(*measurements))
+    print(f'{label:<24} {seconds * 1000:>8.1f} {dispatches:>11.0f} '
+          f'{calls:>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# coding: utf-8
+
+"""
+Bridge calls and time to rotate a phone screen with a layout that differs
+per size class, when the layouts are `anchor.group`s that are switched as
+units, compared with removing and recreating the size class constraints.
+
+    python benchmarks/bench_size_class_groups.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+import anchor
+from anchor import Dock, group
+
+PORTRAIT = (390.0, 844.0)
+LANDSCAPE = (844.0, 390.0)
+
+
+def common(root, views):
+    for view in views:
+        root.add_subview(view)
+        view.at.top == root.at.top
+        view.at.height == 40
+
+
+def regular(root, views):
+    """Views side by side."""
+    previous = root
+    for view in views:
+        view.at.leading == (
+            root.at.leading if previous is root else previous.at.trailing)
+        view.align.width(views[0])
+        previous = view
+    views[-1].at.trailing == root.at.trailing
+
+
+def constrained(root, views):
+    """Views full width, stacked."""
+    previous = None
+    for view in views:
+        view.dock.sides(fit=Dock.TIGHT)
+        if previous is not None:
+            view.at.top == previous.at.bottom
+
+
+def rotate(size):
+    anchor_headless.screen_size = size
+
+
+def switch_groups():
+    group.update()
+
+
+def rebuild(root, views):
+    anchor.remove_constraints(views, second=True)
+    with anchor.batch():
+        common(root, views)
+        if anchor.Dimensions.is_width_constrained():
+            constrained(root, views)
+        else:
+            regular(root, views)
+
+
+def measure(func, *args):
+    anchor_headless.reset_counters()
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+    calls = sum(
+        count for name, count in anchor_headless.calls.items()
+        if 'Constraint' in name)
+    return seconds, calls, anchor_headless.dispatches
+
+
+def main():
+    anchor_headless.interface_idiom = 0
+    print(f'{"views":>6} {"group ms":>9} {"calls":>6} {"dispatches":>11}'
+          f' {"rebuild ms":>11} {"calls":>6} {"dispatches":>11}')
+    for count in (10, 100, 1000):
+        group._groups.clear()
+        rotate(PORTRAIT)
+        root = anchor.View()
+        views = [anchor.View() for _ in range(count)]
+        with anchor.batch():
+            common(root, views)
+        with group('regular'):
+            regular(root, views)
+        with group('constrained'):
+            constrained(root, views)
+
+        rotate(LANDSCAPE)
+        group_time, group_calls, group_dispatches = measure(switch_groups)
+        rotate(PORTRAIT)
+        group.update()
+        anchor.remove_constraints(views, second=True)
+
+        rotate(LANDSCAPE)
+        rebuild_time, rebuild_calls, rebuild_dispatches = measure(
+            rebuild, root, views)
+        print(f'{count:>6} {group_time * 1000:>9.2f} {group_calls:>6} '
+              f'{group_dispatches:>11} {rebuild_time * 1000:>11.2f} '
+              f'{rebuild_calls:>6} {rebuild_dispatches:>11}')
+
+
+if __name__ == '__main__':
+    main()
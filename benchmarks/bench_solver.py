@@ -0,0 +1,71 @@
+# coding: utf-8
+
+"""
+Scaling of the pure-Python solver backend: time to build a layout of N
+views, and to re-solve and read all frames after the root view is resized.
+
+    python benchmarks/bench_solver.py
+"""
+
+import time
+
+import standin
+standin.install()
+
+import anchor
+import anchor_solver
+
+
+def build(count):
+    """Rows of a label and a value view in a container docked to the safe
+    area, with a layout guide splitting the rows in half."""
+    root = anchor.View(frame=(0, 0, 1024, 768), name='root')
+    container = anchor.View(name='container')
+    root.add_subview(container)
+    container.dock.all(fit=anchor.Dock.SAFE)
+    divider = anchor.Guide(container)
+    divider.at.width == 0
+    divider.at.center_x == container.at.center_x
+    previous = None
+    for i in range((count - 2) // 2):
+        label = anchor.Label(name=f'label{i}')
+        value = anchor.View(name=f'value{i}')
+        container.add_subview(label)
+        container.add_subview(value)
+        if previous is None:
+            label.dock.top_leading()
+        else:
+            label.at.top == previous.at.bottom_padding
+            label.align.leading(previous)
+        label.at.height == 20
+        label.at.trailing == divider.at.leading
+        value.at.leading == divider.at.trailing
+        value.at.trailing == container.at.trailing_margin
+        value.align.top(label)
+        value.align.height(label)
+        previous = label
+    return root
+
+
+def main():
+    print(f'{"views":>6} {"constraints":>12} {"build ms":>9} '
+          f'{"re-solve ms":>12}')
+    for count in (50, 100, 250, 500):
+        backend = anchor.backend = anchor_solver.SolverBackend()
+        start = time.perf_counter()
+        root = build(count)
+        backend.layout(root)
+        build_time = time.perf_counter() - start
+        constraints = len(backend.solver._constraints)
+        sizes = [(768, 1024), (1024, 768)] * 10
+        start = time.perf_counter()
+        for width, height in sizes:
+            root.frame = (0, 0, width, height)
+            backend.layout(root)
+        resolve_time = (time.perf_counter() - start) / len(sizes)
+        print(f'{count:>6} {constraints:>12} {build_time * 1000:>9.1f} '
+              f'{resolve_time * 1000:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# coding: utf-8
+
+"""
+Stamping the card layout of dashboard.py onto 500 cards with an
+`anchor.template`, compared with running the same constraint code for
+every card, one by one and within a single batch.
+
+    python benchmarks/bench_template.py
+"""
+
+import gc
+import time
+
+import standin
+standin.install()
+
+import anchor_headless
+import anchor
+
+
+def card_constraints(card, title, content, share=.9):
+    title.dock.bottom_trailing()
+    content.at.center_x == card.at.center_x
+    content.at.center_y == card.at.center_y * 1.25
+    content.at.width == card.at.width * share
+
+
+card_layout = anchor.template(card_constraints)
+
+
+def cards(count):
+    grid = anchor.View()
+    result = []
+    for _ in range(count):
+        card = anchor.View()
+        title = anchor.Label(name='title')
+        content = anchor.Label(name='content')
+        grid.add_subview(card)
+        card.add_subview(title)
+        card.add_subview(content)
+        result.append((card, title, content))
+    return result
+
+
+def one_by_one(view_tuples):
+    for views in view_tuples:
+        card_constraints(*views)
+
+
+def batched(view_tuples):
+    with anchor.batch():
+        one_by_one(view_tuples)
+
+
+def templated(view_tuples):
+    card_layout.apply(view_tuples)
+
+
+def main(count=500):
+    card_layout.recipe()
+    print(f'{"":<12} {"ms":>8} {"calls":>7} {"dispatches":>11}')
+    for func in (one_by_one, batched, templated):
+        view_tuples = cards(count)
+        gc.collect()
+        anchor_headless.reset_counters()
+        start = time.perf_counter()
+        func(view_tuples)
+        seconds = time.perf_counter() - start
+        print(f'{func.__name__:<12} {seconds * 1000:>8.1f} '
+              f'{sum(anchor_headless.calls.values()):>7} '
+              f'{anchor_headless.dispatches:>11}')
+
+
+if __name__ == '__main__':
+    main()
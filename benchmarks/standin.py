@@ -0,0 +1,28 @@
+# coding: utf-8
+
+"""
+Makes the repository root importable for the benchmarks, and gives access
+to the headless stand-ins in `anchor_headless`:
+
+    import standin
+    standin.install()
+
+    import anchor
+"""
+
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+import anchor_headless
+
+
+def install():
+    anchor_headless.install()
+
+
+def __getattr__(name):
+    return getattr(anchor_headless, name)
@@ -0,0 +1,216 @@
+# coding: utf-8
+
+"""
+Benchmark suite for anchor's layout hot paths, run headless against the
+stand-ins in `anchor_headless`. Each scenario is run with 10, 100, 1000
+and 10000 views, recording the best time, and the ObjC bridge calls and
+main thread dispatches of a single run.
+
+    python benchmarks/suite.py --json results.json
+    python benchmarks/suite.py --baseline results.json
+
+With `--baseline`, results are compared with a stored run, and the exit
+status is 1 if any scenario is slower by more than the tolerance, or makes
+more bridge calls or dispatches than before.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import standin
+standin.install()
+
+import anchor
+import anchor_headless
+from anchor import View, Label, Button, TextField, GridView
+from bench_memory import demo_layout
+
+SIZES = (10, 100, 1000, 10000)
+
+scenarios = {}
+
+
+def scenario(func):
+    """Registers a scenario. The function is called with the number of
+    views, sets up what is not measured, and returns the function to time."""
+    scenarios[func.__name__] = func
+    return func
+
+
+def views_in(root, count, cls=View):
+    views = [cls() for _ in range(count)]
+    for view in views:
+        root.add_subview(view)
+    return views
+
+
+@scenario
+def readme_demo(size):
+    count = max(size // 14, 1)
+
+    def run():
+        for _ in range(count):
+            demo_layout()
+    return run
+
+
+@scenario
+def dock_between_chain(size):
+    root = View()
+    views = views_in(root, size)
+
+    def run():
+        previous = None
+        for view in views:
+            view.dock.between(top=previous)
+            previous = view
+    return run
+
+
+@scenario
+def align_center(size):
+    root = View()
+    views = views_in(root, size + 1)
+    anchor.enable(*views)
+
+    def run():
+        views[0].align.center(*views[1:])
+    return run
+
+
+@scenario
+def grid_resize_sweep(size):
+    grid = GridView(frame=(0, 0, 1024, 768))
+    views_in(grid, size)
+
+    def run():
+        for width in range(600, 1100, 25):
+            grid.frame = (0, 0, width, 768)
+            grid.layout()
+    return run
+
+
+@scenario
+def create_view_hierarchy(size):
+    def level(count, depth):
+        if count <= 3:
+            return {
+                f'field_{depth}_{i}': (TextField, Button, Label)[i % 3]
+                for i in range(count)}
+        share = (count - 3) // 3
+        return {
+            f'panel_{depth}_{i}': (View, level(
+                share + (i < (count - 3) % 3), depth + 1))
+            for i in range(3)}
+    spec = {'root': (View, level(size - 1, 0))}
+
+    def run():
+        anchor.create_view_hierarchy(spec)
+    return run
+
+
+@scenario
+def diagnostic_overlay(size):
+    root = View(frame=(0, 0, 1024, 768))
+    previous = None
+    with anchor.batch():
+        for view in views_in(root, size):
+            anchor.enable(view)
+            view.dock.between(top=previous)
+            previous = view
+
+    def run():
+        anchor.DiagnosticOverlay(root)
+    return run
+
+
+def measure(name, size, repeat):
+    best = None
+    for _ in range(repeat):
+        run = scenarios[name](size)
+        anchor_headless.reset_counters()
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return {
+        'scenario': name,
+        'size': size,
+        'seconds': best,
+        'bridge_calls': sum(anchor_headless.calls.values()),
+        'dispatches': anchor_headless.dispatches,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints the change from the baseline, and returns the number of
+    regressions."""
+    previous = {
+        (result['scenario'], result['size']): result
+        for result in baseline['results']}
+    regressions = 0
+    print(f'\n{"scenario":<24} {"size":>6} {"time":>8} '
+          f'{"calls":>8} {"dispatches":>10}')
+    for result in results:
+        before = previous.get((result['scenario'], result['size']))
+        if before is None:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        calls = result['bridge_calls'] - before['bridge_calls']
+        dispatches = result['dispatches'] - before['dispatches']
+        regressed = ratio > 1 + tolerance or calls > 0 or dispatches > 0
+        regressions += regressed
+        print(f'{result["scenario"]:<24} {result["size"]:>6} '
+              f'{ratio - 1:>+8.0%} {calls:>+8} {dispatches:>+10}'
+              f'{"  REGRESSION" if regressed else ""}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument(
+        '--scenarios', nargs='+', choices=sorted(scenarios),
+        default=list(scenarios))
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='runs per measurement, the best time is kept')
+    parser.add_argument('--json', help='file to write the results to')
+    parser.add_argument('--baseline', help='results to compare with')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='allowed slowdown against the baseline, default 0.2')
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f'{"scenario":<24} {"size":>6} {"ms":>10} '
+          f'{"calls":>8} {"dispatches":>10}')
+    for name in args.scenarios:
+        for size in args.sizes:
+            result = measure(name, size, args.repeat)
+            results.append(result)
+            print(f'{name:<24} {size:>6} {result["seconds"] * 1000:>10.2f} '
+                  f'{result["bridge_calls"]:>8} {result["dispatches"]:>10}')
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                'anchor_version': anchor.__version__,
+                'python': platform.python_version(),
+                'results': results,
+            }, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())